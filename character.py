@@ -8,6 +8,8 @@ import logging
 logger = logging.getLogger(__name__)
 
 class Character(Entity):
+    __slots__ = ('behavior', 'dialogue', 'inventory')
+
     def __init__(self, char_id: str, data: dict = None):
         super().__init__(char_id, data)
         self.behavior = data.get('behavior', 'neutral')
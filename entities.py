@@ -1224,6 +1224,8 @@ class BaseEntity:
         pass  # lub super().__init__()
 
 class Entity:
+    __slots__ = ('id', 'name', 'type', 'stats')
+
     def __init__(self, entity_id: str, data: dict):
         if not isinstance(entity_id, str) or not isinstance(data, dict):
             raise ValueError("Nieprawidłowe argumenty konstruktora Entity")
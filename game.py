@@ -64,6 +64,8 @@ class GameEngine:
         
         # Inicjalizacja kolejek
         self.event_queue = []
+        # Trwająca aktualizacja świata (rozłożona na kolejne klatki)
+        self._world_tick = None
         self.message_queue = []
         
         # Stan gry
@@ -101,6 +103,7 @@ class GameEngine:
             self.player.inventory.set_item_manager(self.item_manager)
             self.player.initialize_quests(self.quest_manager)
             self.player.current_location = "miasto_startowe"
+            self.world.on_player_enter(self.player.current_location)
             
             return True
         except Exception as e:
@@ -126,6 +129,7 @@ class GameEngine:
             
             # Wczytaj stan świata
             self.world.load_state(save_data.get('world_state', {}))
+            self.world.on_player_enter(self.player.current_location)
             
             # Wczytaj stan NPCs
             self.character_manager.load_state(save_data.get('npc_state', {}))
@@ -168,8 +172,16 @@ class GameEngine:
         if not self.running or self.paused:
             return
             
-        # Aktualizacja świata
-        self.world.update(self.game_time.get_game_time())
+        # Aktualizacja świata - jedna porcja lokacji na klatkę, z bieżącym czasem gry
+        now = self.game_time.get_game_time()
+        try:
+            if self._world_tick is None:
+                self._world_tick = self.world.update_iter(now)
+                next(self._world_tick)
+            else:
+                self._world_tick.send(now)
+        except StopIteration:  # cykl aktualizacji zakończony
+            self._world_tick = None
         
         # Aktualizacja gracza
         self.player.update(self.game_time.get_game_time())
@@ -260,6 +272,7 @@ class GameEngine:
         
         # Teleportuj gracza
         self.player.current_location = spawn_point
+        self.world.on_player_enter(spawn_point)
         
         # Przywróć podstawowe statystyki
         self.player.stats.health = self.player.stats.max_health // 2
@@ -341,7 +354,8 @@ class GameEngine:
         # Wykonaj ruch
         old_location = self.player.current_location
         self.player.current_location = destination
-        self.player.known_locations.add(destination)
+        self.world.on_player_enter(destination)
+        self.player.add_known_location(destination)
         
         # Aktualizuj statystyki
         self.player.player_stats['distance_traveled'] += 1
@@ -462,7 +462,7 @@ class GameInterface:
             print("Nie masz aktywnych zadań!")
             return
 
-        for quest in player.active_quests:
+        for quest in player.active_quests.values():
             print(f"\n- {quest.name}")
             print(f"  Opis: {quest.description}")
             current_stage = quest.get_current_stage()
@@ -520,7 +520,7 @@ class GameInterface:
         # Aktywne questy
         if player.active_quests:
             print(f"\n{self.display_config.colors['secondary']}Aktywne zadania:{Style.RESET_ALL}")
-            for quest in player.active_quests:
+            for quest in player.active_quests.values():
                 current_stage = quest.get_current_stage()
                 progress = self.draw_progress_bar(
                     quest.current_stage,
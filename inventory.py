@@ -33,15 +33,18 @@ class Inventory:
 
     def remove_item(self, item_id, quantity=1):
         """Removes an item from the inventory."""
-        if item_id not in self.items:
+        current = self.items.get(item_id)
+        if current is None:
             return False, "Nie znaleziono przedmiotu w ekwipunku."
-        if self.items[item_id] < quantity:
+        if current < quantity:
             return False, "Nie masz wystarczającej ilości tego przedmiotu."
         
         item = self.item_manager.get_item(item_id)
-        self.items[item_id] -= quantity
-        if self.items[item_id] <= 0:
+        remaining = current - quantity
+        if remaining <= 0:
             del self.items[item_id]
+        else:
+            self.items[item_id] = remaining
         return True, f"{item.name}"
 
     def equip_item(self, item_id, player):
@@ -243,7 +246,7 @@ class Inventory:
 
     def has_item(self, item_id: str) -> bool:
         """Sprawdza czy przedmiot jest w ekwipunku."""
-        return item_id in self.items and self.items[item_id] > 0
+        return self.items.get(item_id, 0) > 0
 
     def can_add_item(self, item_id: str) -> bool:
         """Sprawdza czy można dodać przedmiot."""
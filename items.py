@@ -9,6 +9,25 @@ class Item:
         # Zapisujemy wszystkie pozostałe właściwości
         self.properties = {k: v for k, v in data.items() 
                          if k not in ['name', 'description', 'type']}
+        
+        # Spłaszczone wymagania przedmiotu (sprawdzane przy zakładaniu)
+        reqs = self.properties.get('requirements', {})
+        self.req_level = reqs.get('level', 0)
+        self.req_skills = tuple(
+            (category, skill, required_level)
+            for category, skill_reqs in reqs.get('skills', {}).items()
+            for skill, required_level in skill_reqs.items()
+        )
+        self.req_stats = tuple(reqs.get('stats', {}).items())
+        
+        # Spłaszczone bonusy przedmiotu (aplikowane przy zakładaniu i zdejmowaniu)
+        bonuses = self.properties.get('bonuses', {})
+        self.bonus_stats = tuple(bonuses.get('stats', {}).items())
+        self.bonus_skills = tuple(
+            ((category, skill), value)
+            for category, skills in bonuses.get('skills', {}).items()
+            for skill, value in skills.items()
+        )
         print(f"DEBUG Item: Utworzono przedmiot: {self.name}, typ: {self.type}, właściwości: {self.properties}")  # Debug
 
 class ItemManager:
@@ -1,20 +1,164 @@
 # player.py
 from inventory import Inventory
 import json
+import math
 import random
 import time
 import logging
+from collections import defaultdict, namedtuple
+from functools import lru_cache
 from typing import List, Optional, Dict
 from entities import Entity, Stats, StatusEffect  # Dodany import Entity
 from config import game_config
-from quests import QuestManager
+from quests import QuestManager, Quest
 from character import Character
 
 # Konfiguracja loggera
 logger = logging.getLogger(__name__)
 
 
+# Zdolności odblokowywane na kolejnych poziomach umiejętności
+_ABILITY_UNLOCKS = {
+    'combat': {
+        'melee': {
+            3: 'Potężne uderzenie',
+            5: 'Wirujący cios',
+            7: 'Rozłupanie zbroi'
+        },
+        'ranged': {
+            3: 'Precyzyjny strzał',
+            5: 'Strzał wielokrotny',
+            7: 'Strzał osłabiający'
+        },
+        'defense': {
+            3: 'Blok tarczą',
+            5: 'Kontratak',
+            7: 'Niezniszczalna postawa'
+        }
+    },
+    'crafting': {
+        'smithing': {
+            3: 'Ulepszanie broni',
+            5: 'Mistrzowska naprawa',
+            7: 'Wykuwanie magicznej broni'
+        },
+        'alchemy': {
+            3: 'Ulepszone mikstury',
+            5: 'Trwałe eliksiry',
+            7: 'Mistyczne wywary'
+        },
+        'enchanting': {
+            3: 'Podstawowe zaklęcia',
+            5: 'Potężne enchant',
+            7: 'Legendarne zaklęcia'
+        }
+    },
+    'survival': {
+        'gathering': {
+            3: 'Podwójne zbiory',
+            5: 'Rzadkie zasoby',
+            7: 'Mistrzowskie zbieractwo'
+        },
+        'tracking': {
+            3: 'Śledzenie zwierzyny',
+            5: 'Tropienie rzadkich stworzeń',
+            7: 'Mistrzowskie tropienie'
+        },
+        'stealth': {
+            3: 'Cichy chód',
+            5: 'Znikanie w cieniu',
+            7: 'Mistrzowskie skradanie'
+        }
+    }
+}
+
+# Spłaszczona wersja: (kategoria, umiejętność, poziom) -> nazwa zdolności
+_ABILITY_UNLOCKS_FLAT = {
+    (category, skill, level): ability
+    for category, skills in _ABILITY_UNLOCKS.items()
+    for skill, levels in skills.items()
+    for level, ability in levels.items()
+}
+
+# Typ ekwipunku -> slot, w którym jest zakładany
+_TYPE_TO_SLOT = {
+    'weapon': 'main_hand',
+    'shield': 'off_hand',
+    'helmet': 'head',
+    'armor': 'chest',
+    'legs': 'legs',
+    'boots': 'feet',
+    'ring': 'ring1',  # lub ring2
+    'necklace': 'necklace'
+}
+
+# Regeneracja podczas odpoczynku: (zasób, maksimum, część maksimum na sekundę)
+_REST_REGEN_RATES = (
+    ('health', 'max_health', 0.1),
+    ('stamina', 'max_stamina', 0.2),
+    ('mana', 'max_mana', 0.15),
+)
+
+# Progi osiągnięć za ukończone questy (rosnąco): (wymagana liczba, ID osiągnięcia)
+_QUEST_ACHIEVEMENT_THRESHOLDS = (
+    (5, 'quest_novice'),      # Początkujący poszukiwacz przygód
+    (25, 'quest_expert'),     # Ekspert zadań
+    (100, 'quest_master'),    # Mistrz zadań
+)
+
+# Wpis dziennika questów; timestamp to czas ścienny w nanosekundach, liczony
+# z zegara monotonicznego względem punktu odniesienia z chwili importu modułu
+QuestLogEntry = namedtuple('QuestLogEntry', 'timestamp type quest_id quest_name')
+_CLOCK_ORIGIN_NS = time.time_ns() - time.monotonic_ns()
+
+
+def _log_timestamp() -> int:
+    """Zwraca znacznik czasu wpisu dziennika w nanosekundach."""
+    return _CLOCK_ORIGIN_NS + time.monotonic_ns()
+
+
+def _load_quest_log(entries: list) -> List[QuestLogEntry]:
+    """Odtwarza dziennik questów z zapisu (także ze starszego formatu słowników)."""
+    quest_log = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            entry = dict(entry, timestamp=int(entry['timestamp'] * 1_000_000_000))
+            quest_log.append(QuestLogEntry(**entry))
+        else:
+            quest_log.append(QuestLogEntry(*entry))
+    return quest_log
+
+# Szansa na upuszczenie każdego przedmiotu z ekwipunku po śmierci gracza
+_LOOT_DROP_CHANCE = 0.1
+_LOG_LOOT_MISS = math.log1p(-_LOOT_DROP_CHANCE)
+
+
+@lru_cache(maxsize=None)
+def _next_level_exp(level: int) -> int:
+    """Zwraca doświadczenie wymagane do awansu z danego poziomu postaci."""
+    return int(100 * (level ** 1.5))
+
+
+@lru_cache(maxsize=None)
+def _skill_level_exp(level: int) -> int:
+    """Zwraca doświadczenie wymagane do awansu z danego poziomu umiejętności."""
+    return int(75 * (level ** 1.8))
+
+
 class Player(Character):
+    __slots__ = (
+        'equipment', 'equipment_slots', 'status_effects', 'position', 'in_combat',
+        'level', 'experience', 'experience_to_next_level', 'gold', 'current_location',
+        'health', 'max_health', 'mana', 'max_mana', 'strength', 'defense',
+        'skills', 'skill_experience', 'skill_points', 'talent_points',
+        'skill_bonuses', '_equipment_skill_bonus_cache', 'ability_cooldowns',
+        'reputation', 'achievements', 'known_locations', 'player_stats',
+        '_achievements_list', '_known_locations_list',
+        'quest_manager', 'quest_log', 'active_quests', 'completed_quests',
+        '_completed_quest_ids', '_quests_by_event',
+        '_reward_handlers', '_serialized'
+    )
+
     def __init__(self, player_id: str, data: dict = None):
         if data is None:
             data = self._get_default_player_data()
@@ -28,6 +172,39 @@ class Player(Character):
         self.experience = data.get('experience', 0)
         self.gold = data.get('gold', 0)
         self.current_location = data.get('current_location', 'miasto_startowe')
+        
+        # Questy gracza wraz z indeksami do szybkiego wyszukiwania po ID
+        # (aktywne: quest_id -> Quest, w kolejności przyjęcia)
+        self.active_quests: Dict[str, Quest] = {}
+        self.completed_quests = []
+        self._completed_quest_ids = set()
+        # Typ wydarzenia -> aktywne questy z takim celem (quest_id -> Quest)
+        self._quests_by_event: Dict[str, dict] = defaultdict(dict)
+        # Wynik serialize() ważny do następnej zmiany listy questów
+        self._serialized = None
+        self.quest_log: List[QuestLogEntry] = []
+        
+        # Osiągnięcia i odkryte lokacje: zbiory do sprawdzania oraz listy
+        # w kolejności dodania, zwracane bez kopiowania przy zapisie
+        self.achievements = set()
+        self._achievements_list = []
+        self.known_locations = set()
+        self._known_locations_list = []
+        
+        # Bonusy umiejętności z przedmiotów, (kategoria, umiejętność) -> bonus
+        self.skill_bonuses: Dict[tuple, float] = defaultdict(float)
+        
+        # Zagregowane bonusy umiejętności z ekwipunku, (kategoria, umiejętność) -> bonus
+        self._equipment_skill_bonus_cache: Optional[Dict[tuple, float]] = None
+        
+        # Obsługa nagród wg typu (questy i osiągnięcia)
+        self._reward_handlers = {
+            'experience': self.gain_experience,
+            'gold': self._grant_gold_reward,
+            'items': self._grant_item_rewards,
+            'reputation': self._grant_reputation_rewards,
+            'skill_experience': self._grant_skill_experience_rewards
+        }
 
     def _get_default_player_data(self) -> dict:
         """Zwraca domyślne dane dla nowego gracza."""
@@ -52,13 +229,16 @@ class Player(Character):
 
     def _calculate_next_level_exp(self) -> int:
         """Oblicza wymagane doświadczenie do następnego poziomu."""
-        return int(100 * (self.level ** 1.5))
+        return _next_level_exp(self.level)
 
     def gain_experience(self, amount: int) -> List[str]:
         """Dodaje doświadczenie i sprawdza awans na wyższy poziom."""
-        messages = []
         self.experience += amount
-        messages.append(f"Zdobyto {amount} punktów doświadczenia!")
+        messages = [f"Zdobyto {amount} punktów doświadczenia!"]
+        
+        # Najczęstszy przypadek: brak awansu
+        if self.experience < self.experience_to_next_level:
+            return messages
         
         while self.experience >= self.experience_to_next_level:
             self.level_up()
@@ -75,24 +255,19 @@ class Player(Character):
         self.talent_points += 1
         
         # Zwiększanie podstawowych statystyk
-        stat_increases = {
-            'max_health': 10,
-            'max_stamina': 5,
-            'max_mana': 5,
-            'strength': 1,
-            'defense': 1,
-            'agility': 1,
-            'intelligence': 1
-        }
-        
-        for stat, increase in stat_increases.items():
-            current_value = getattr(self.stats, stat)
-            setattr(self.stats, stat, current_value + increase)
+        stats = self.stats
+        stats.max_health += 10
+        stats.max_stamina += 5
+        stats.max_mana += 5
+        stats.strength += 1
+        stats.defense += 1
+        stats.agility += 1
+        stats.intelligence += 1
             
         # Przywrócenie zdrowia i zasobów
-        self.stats.health = self.stats.max_health
-        self.stats.stamina = self.stats.max_stamina
-        self.stats.mana = self.stats.max_mana
+        stats.health = stats.max_health
+        stats.stamina = stats.max_stamina
+        stats.mana = stats.max_mana
         
     # Kontynuacja klasy Player
 
@@ -124,65 +299,11 @@ class Player(Character):
 
     def _calculate_skill_level_exp(self, current_level: int) -> int:
         """Oblicza wymagane doświadczenie do następnego poziomu umiejętności."""
-        return int(75 * (current_level ** 1.8))
+        return _skill_level_exp(current_level)
 
     def _check_new_abilities(self, category: str, skill: str, level: int) -> Optional[str]:
         """Sprawdza czy na danym poziomie odblokowuje się nowa zdolność."""
-        ability_unlocks = {
-            'combat': {
-                'melee': {
-                    3: 'Potężne uderzenie',
-                    5: 'Wirujący cios',
-                    7: 'Rozłupanie zbroi'
-                },
-                'ranged': {
-                    3: 'Precyzyjny strzał',
-                    5: 'Strzał wielokrotny',
-                    7: 'Strzał osłabiający'
-                },
-                'defense': {
-                    3: 'Blok tarczą',
-                    5: 'Kontratak',
-                    7: 'Niezniszczalna postawa'
-                }
-            },
-            'crafting': {
-                'smithing': {
-                    3: 'Ulepszanie broni',
-                    5: 'Mistrzowska naprawa',
-                    7: 'Wykuwanie magicznej broni'
-                },
-                'alchemy': {
-                    3: 'Ulepszone mikstury',
-                    5: 'Trwałe eliksiry',
-                    7: 'Mistyczne wywary'
-                },
-                'enchanting': {
-                    3: 'Podstawowe zaklęcia',
-                    5: 'Potężne enchant',
-                    7: 'Legendarne zaklęcia'
-                }
-            },
-            'survival': {
-                'gathering': {
-                    3: 'Podwójne zbiory',
-                    5: 'Rzadkie zasoby',
-                    7: 'Mistrzowskie zbieractwo'
-                },
-                'tracking': {
-                    3: 'Śledzenie zwierzyny',
-                    5: 'Tropienie rzadkich stworzeń',
-                    7: 'Mistrzowskie tropienie'
-                },
-                'stealth': {
-                    3: 'Cichy chód',
-                    5: 'Znikanie w cieniu',
-                    7: 'Mistrzowskie skradanie'
-                }
-            }
-        }
-        
-        return ability_unlocks.get(category, {}).get(skill, {}).get(level)
+        return _ABILITY_UNLOCKS_FLAT.get((category, skill, level))
 
     def spend_skill_points(self, category: str, skill: str, points: int) -> tuple[bool, str]:
         """Wydaje punkty umiejętności na rozwój konkretnej umiejętności."""
@@ -223,7 +344,13 @@ class Player(Character):
 
     def _get_equipment_skill_bonus(self, category: str, skill: str) -> float:
         """Oblicza bonus do umiejętności z ekwipunku."""
-        total_bonus = 0.0
+        if self._equipment_skill_bonus_cache is None:
+            self._equipment_skill_bonus_cache = self._build_equipment_skill_bonuses()
+        return self._equipment_skill_bonus_cache.get((category, skill), 0.0)
+
+    def _build_equipment_skill_bonuses(self) -> Dict[tuple, float]:
+        """Sumuje bonusy do umiejętności ze wszystkich założonych przedmiotów."""
+        bonuses = {}
         
         for slot, item in self.equipment_slots.items():
             if not item:
@@ -231,12 +358,12 @@ class Player(Character):
             
             # Sprawdź bonusy przedmiotu do umiejętności
             item_data = item.get_data()
-            if 'skill_bonuses' in item_data:
-                if category in item_data['skill_bonuses']:
-                    if skill in item_data['skill_bonuses'][category]:
-                        total_bonus += item_data['skill_bonuses'][category][skill]
+            for category, skills in item_data.get('skill_bonuses', {}).items():
+                for skill, value in skills.items():
+                    key = (category, skill)
+                    bonuses[key] = bonuses.get(key, 0.0) + value
                         
-        return total_bonus
+        return bonuses
 
     def _get_talent_skill_bonus(self, category: str, skill: str) -> float:
         """Oblicza bonus do umiejętności z talentów."""
@@ -247,14 +374,14 @@ class Player(Character):
         """Zwraca wszystkie aktywne modyfikatory umiejętności."""
         modifiers = {}
         
-        for category in self.skills:
-            modifiers[category] = {}
-            for skill in self.skills[category]:
-                base_bonus = self.get_skill_bonus(category, skill)
+        for category, skills in self.skills.items():
+            category_modifiers = modifiers[category] = {}
+            for skill, skill_level in skills.items():
+                base_bonus = skill_level * 0.1  # 10% bonus na poziom
                 equipment_bonus = self._get_equipment_skill_bonus(category, skill)
                 talent_bonus = self._get_talent_skill_bonus(category, skill)
                 
-                modifiers[category][skill] = {
+                category_modifiers[skill] = {
                     'base_bonus': base_bonus,
                     'equipment_bonus': equipment_bonus,
                     'talent_bonus': talent_bonus,
@@ -290,6 +417,7 @@ class Player(Character):
             
         # Załóż nowy przedmiot
         self.equipment_slots[slot] = item_id
+        self._equipment_skill_bonus_cache = None
         self.inventory.remove_item(item_id, 1)
         
         # Aplikuj bonusy z przedmiotu
@@ -316,33 +444,28 @@ class Player(Character):
         
         # Przenieś przedmiot do ekwipunku
         self.equipment_slots[slot] = None
+        self._equipment_skill_bonus_cache = None
         self.inventory.add_item(item_id, 1)
         
         return True, f"Zdjęto {item.name} ze slotu {slot}!"
 
     def _check_item_requirements(self, item) -> bool:
         """Sprawdza czy gracz spełnia wymagania przedmiotu."""
-        if 'requirements' not in item.properties:
-            return True
-            
-        reqs = item.properties['requirements']
-        
         # Sprawdź wymagany poziom
-        if 'level' in reqs and self.level < reqs['level']:
+        if self.level < item.req_level:
             return False
             
         # Sprawdź wymagane umiejętności
-        if 'skills' in reqs:
-            for category, skill_reqs in reqs['skills'].items():
-                for skill, required_level in skill_reqs.items():
-                    if self.skills[category][skill] < required_level:
-                        return False
+        skills = self.skills
+        for category, skill, required_level in item.req_skills:
+            if skills[category][skill] < required_level:
+                return False
                         
         # Sprawdź wymagane statystyki
-        if 'stats' in reqs:
-            for stat, required_value in reqs['stats'].items():
-                if getattr(self.stats, stat) < required_value:
-                    return False
+        stats = self.stats
+        for stat, required_value in item.req_stats:
+            if getattr(stats, stat) < required_value:
+                return False
                     
         return True
     
@@ -361,17 +484,6 @@ class Player(Character):
 
     def _determine_equipment_slot(self, item) -> Optional[str]:
         """Określa odpowiedni slot dla przedmiotu."""
-        type_to_slot = {
-            'weapon': 'main_hand',
-            'shield': 'off_hand',
-            'helmet': 'head',
-            'armor': 'chest',
-            'legs': 'legs',
-            'boots': 'feet',
-            'ring': 'ring1',  # lub ring2
-            'necklace': 'necklace'
-        }
-        
         item_type = item.properties.get('equipment_type')
         if not item_type:
             return None
@@ -385,25 +497,21 @@ class Player(Character):
             else:
                 return 'ring1'  # Domyślnie zastąp pierwszy pierścień
                 
-        return type_to_slot.get(item_type)
+        return _TYPE_TO_SLOT.get(item_type)
 
     def _apply_item_bonuses(self, item, adding: bool = True):
         """Aplikuje lub usuwa bonusy z przedmiotu."""
-        if 'bonuses' not in item.properties:
-            return
-            
         multiplier = 1 if adding else -1
-        bonuses = item.properties['bonuses']
         
         # Aplikuj bonusy do statystyk
-        for stat, value in bonuses.get('stats', {}).items():
-            current = getattr(self.stats, stat)
-            setattr(self.stats, stat, current + (value * multiplier))
+        stats = self.stats
+        for stat, value in item.bonus_stats:
+            setattr(stats, stat, getattr(stats, stat) + value * multiplier)
             
         # Aplikuj bonusy do umiejętności
-        for category, skills in bonuses.get('skills', {}).items():
-            for skill, value in skills.items():
-                self.skill_bonuses[category][skill] = self.skill_bonuses.get(category, {}).get(skill, 0) + (value * multiplier)
+        skill_bonuses = self.skill_bonuses
+        for skill_key, value in item.bonus_skills:
+            skill_bonuses[skill_key] += value * multiplier
 
     def interact_with_object(self, object_id: str, world) -> tuple[bool, str]:
         """Interakcja z obiektami w świecie gry."""
@@ -460,24 +568,12 @@ class Player(Character):
         if self.in_combat:
             return False, "Nie możesz odpoczywać podczas walki!"
             
-        # Oblicz ilość odnowionych zasobów
-        health_regen = min(
-            self.stats.max_health - self.stats.health,
-            duration * (self.stats.max_health * 0.1)
-        )
-        stamina_regen = min(
-            self.stats.max_stamina - self.stats.stamina,
-            duration * (self.stats.max_stamina * 0.2)
-        )
-        mana_regen = min(
-            self.stats.max_mana - self.stats.mana,
-            duration * (self.stats.max_mana * 0.15)
-        )
-        
-        # Aplikuj regenerację
-        self.stats.health += health_regen
-        self.stats.stamina += stamina_regen
-        self.stats.mana += mana_regen
+        # Oblicz i aplikuj regenerację wszystkich zasobów w jednym przebiegu
+        stats = self.stats
+        for stat, max_stat, rate in _REST_REGEN_RATES:
+            max_value = getattr(stats, max_stat)
+            value = getattr(stats, stat)
+            setattr(stats, stat, value + min(max_value - value, duration * (max_value * rate)))
         
         return True, f"Odpocząłeś przez {duration} sekund i odnowiłeś zasoby!"
 
@@ -490,9 +586,9 @@ class Player(Character):
             'skill_points': self.skill_points,
             'equipment': self.equipment_slots,
             'reputation': self.reputation,
-            'active_quests': [quest.id for quest in self.active_quests],
-            'achievements': list(self.achievements),
-            'known_locations': list(self.known_locations),
+            'active_quests': list(self.active_quests),
+            'achievements': self._achievements_list,
+            'known_locations': self._known_locations_list,
             'player_stats': self.player_stats
         }
         return {**base_state, **player_state}
@@ -501,36 +597,58 @@ class Player(Character):
 
     def accept_quest(self, quest_id: str) -> tuple[bool, str]:
         """Przyjmuje nowy quest."""
-        if quest_id in [quest.id for quest in self.active_quests]:
+        if quest_id in self.active_quests:
             return False, "Ten quest jest już aktywny!"
             
-        if quest_id in [quest.id for quest in self.completed_quests]:
-            quest = self.quest_manager.get_quest(quest_id)
-            if not quest.repeatable:
-                return False, "Ten quest został już ukończony!"
-        
         quest = self.quest_manager.get_quest(quest_id)
         if not quest:
             return False, "Nie znaleziono questa!"
             
+        if quest_id in self._completed_quest_ids and not quest.repeatable:
+            return False, "Ten quest został już ukończony!"
+            
         # Sprawdź wymagania questa
         if not self._check_quest_requirements(quest):
             return False, f"Nie spełniasz wymagań questa! (Wymagany poziom: {quest.min_level})"
             
         # Dodaj quest do aktywnych
-        self.active_quests.append(quest)
+        self._add_active_quest(quest)
         quest.start()
         
         # Dodaj wpis do dziennika
-        self.quest_log.append({
-            'timestamp': time.time(),
-            'type': 'quest_accepted',
-            'quest_id': quest_id,
-            'quest_name': quest.name
-        })
+        self.quest_log.append(QuestLogEntry(
+            _log_timestamp(), 'quest_accepted', quest_id, quest.name
+        ))
         
         return True, f"Przyjęto quest: {quest.name}"
 
+    def _add_active_quest(self, quest):
+        """Dodaje quest do aktywnych i do indeksów wyszukiwania."""
+        self.active_quests[quest.id] = quest
+        self._serialized = None
+        for event_type in self._get_quest_event_types(quest):
+            self._quests_by_event[event_type][quest.id] = quest
+
+    def _remove_active_quest(self, quest_id: str):
+        """Usuwa quest z aktywnych i z indeksów. Zwraca quest lub None."""
+        quest = self.active_quests.pop(quest_id, None)
+        if not quest:
+            return None
+            
+        self._serialized = None
+        for event_type in self._get_quest_event_types(quest):
+            listeners = self._quests_by_event.get(event_type)
+            if listeners:
+                listeners.pop(quest_id, None)
+                if not listeners:
+                    del self._quests_by_event[event_type]
+        return quest
+
+    @staticmethod
+    def _get_quest_event_types(quest) -> set:
+        """Zwraca typy wydarzeń, na które reagują etapy questa."""
+        return {stage['objective'] for stage in quest.stages if 'objective' in stage}
+
     def _check_quest_requirements(self, quest) -> bool:
         """Sprawdza czy gracz spełnia wymagania questa."""
         if self.level < quest.min_level:
@@ -554,7 +672,7 @@ class Player(Character):
     def update_quest_progress(self, event_type: str, target_id: str, amount: int = 1) -> List[str]:
         """Aktualizuje postęp questów na podstawie wydarzeń w grze."""
         messages = []
-        for quest in self.active_quests:
+        for quest in list(self._quests_by_event.get(event_type, {}).values()):
             if quest.check_objective(event_type, target_id):
                 progress = quest.update_progress(amount)
                 messages.extend(progress)
@@ -569,37 +687,20 @@ class Player(Character):
     def complete_quest(self, quest_id: str) -> List[str]:
         """Kończy quest i przyznaje nagrody."""
         messages = []
-        quest = next((q for q in self.active_quests if q.id == quest_id), None)
+        # Usuń z aktywnych i dodaj do ukończonych
+        quest = self._remove_active_quest(quest_id)
         if not quest:
             return ["Quest nie jest aktywny!"]
             
-        # Usuń z aktywnych i dodaj do ukończonych
-        self.active_quests.remove(quest)
         if not quest.repeatable:
             self.completed_quests.append(quest)
+            self._completed_quest_ids.add(quest_id)
             
         # Przyznaj nagrody
         rewards = quest.get_rewards()
         messages.append(f"Ukończono quest: {quest.name}!")
         
-        for reward_type, value in rewards.items():
-            if reward_type == 'experience':
-                messages.extend(self.gain_experience(value))
-            elif reward_type == 'gold':
-                self.gold += value
-                messages.append(f"Otrzymano {value} złota!")
-            elif reward_type == 'items':
-                for item_id, amount in value.items():
-                    success, msg = self.inventory.add_item(item_id, amount)
-                    messages.append(msg)
-            elif reward_type == 'reputation':
-                for faction, amount in value.items():
-                    self.add_reputation(faction, amount)
-                    messages.append(f"Zmiana reputacji z {faction}: {amount}")
-            elif reward_type == 'skill_experience':
-                for category, skill_rewards in value.items():
-                    for skill, amount in skill_rewards.items():
-                        messages.extend(self.gain_skill_experience(category, skill, amount))
+        messages.extend(self._grant_rewards(rewards))
                         
         # Aktualizuj statystyki
         self.player_stats['quests_completed'] += 1
@@ -609,29 +710,19 @@ class Player(Character):
         
         return messages
 
+    def add_known_location(self, location_id: str):
+        """Dodaje lokację do odkrytych przez gracza."""
+        if location_id not in self.known_locations:
+            self.known_locations.add(location_id)
+            self._known_locations_list.append(location_id)
+
     def _check_quest_achievements(self):
         """Sprawdza i przyznaje osiągnięcia związane z questami."""
-        quest_achievements = {
-            'quest_novice': {
-                'name': 'Początkujący poszukiwacz przygód',
-                'requirement': 5,
-                'type': 'quests_completed'
-            },
-            'quest_expert': {
-                'name': 'Ekspert zadań',
-                'requirement': 25,
-                'type': 'quests_completed'
-            },
-            'quest_master': {
-                'name': 'Mistrz zadań',
-                'requirement': 100,
-                'type': 'quests_completed'
-            }
-        }
-        
-        for achievement_id, data in quest_achievements.items():
-            if (achievement_id not in self.achievements and 
-                self.player_stats[data['type']] >= data['requirement']):
+        quests_completed = self.player_stats['quests_completed']
+        for requirement, achievement_id in _QUEST_ACHIEVEMENT_THRESHOLDS:
+            if quests_completed < requirement:
+                break
+            if achievement_id not in self.achievements:
                 self.unlock_achievement(achievement_id)
 
     def unlock_achievement(self, achievement_id: str) -> tuple[bool, str]:
@@ -644,6 +735,7 @@ class Player(Character):
             return False, "Nieznane osiągnięcie!"
             
         self.achievements.add(achievement_id)
+        self._achievements_list.append(achievement_id)
         
         # Przyznaj nagrody za osiągnięcie
         if 'rewards' in achievement_data:
@@ -653,14 +745,46 @@ class Player(Character):
 
     def _grant_achievement_rewards(self, rewards: dict):
         """Przyznaje nagrody za osiągnięcie."""
+        self._grant_rewards(rewards)
+
+    def _grant_rewards(self, rewards: dict) -> List[str]:
+        """Przyznaje nagrody wg typu i zwraca komunikaty."""
+        messages = []
+        handlers = self._reward_handlers
         for reward_type, value in rewards.items():
-            if reward_type == 'experience':
-                self.gain_experience(value)
-            elif reward_type == 'gold':
-                self.gold += value
-            elif reward_type == 'items':
-                for item_id, amount in value.items():
-                    self.inventory.add_item(item_id, amount)
+            handler = handlers.get(reward_type)
+            if handler:
+                messages.extend(handler(value))
+        return messages
+
+    def _grant_gold_reward(self, amount: int) -> List[str]:
+        """Przyznaje nagrodę w złocie."""
+        self.gold += amount
+        return [f"Otrzymano {amount} złota!"]
+
+    def _grant_item_rewards(self, items: dict) -> List[str]:
+        """Przyznaje nagrody w przedmiotach."""
+        messages = []
+        for item_id, amount in items.items():
+            success, msg = self.inventory.add_item(item_id, amount)
+            messages.append(msg)
+        return messages
+
+    def _grant_reputation_rewards(self, reputation: dict) -> List[str]:
+        """Przyznaje nagrody w reputacji."""
+        messages = []
+        for faction, amount in reputation.items():
+            self.add_reputation(faction, amount)
+            messages.append(f"Zmiana reputacji z {faction}: {amount}")
+        return messages
+
+    def _grant_skill_experience_rewards(self, skill_experience: dict) -> List[str]:
+        """Przyznaje doświadczenie umiejętności."""
+        messages = []
+        for category, skill_rewards in skill_experience.items():
+            for skill, amount in skill_rewards.items():
+                messages.extend(self.gain_skill_experience(category, skill, amount))
+        return messages
 
     def save_game(self) -> dict:
         """Przygotowuje dane do zapisu stanu gry."""
@@ -679,12 +803,12 @@ class Player(Character):
                 'inventory': self.inventory.get_save_data(),
                 'reputation': self.reputation,
                 'quests': {
-                    'active': [quest.id for quest in self.active_quests],
+                    'active': list(self.active_quests),
                     'completed': [quest.id for quest in self.completed_quests]
                 },
-                'achievements': list(self.achievements),
+                'achievements': self._achievements_list,
                 'player_stats': self.player_stats,
-                'known_locations': list(self.known_locations),
+                'known_locations': self._known_locations_list,
                 'quest_log': self.quest_log
             },
             'game_state': {
@@ -715,19 +839,23 @@ class Player(Character):
             
             # Ekwipunek i wyposażenie
             self.equipment_slots = player_data['equipment']
+            self._equipment_skill_bonus_cache = None
             self.inventory.load_save_data(player_data['inventory'])
             
             # Reputacja i osiągnięcia
             self.reputation = player_data['reputation']
-            self.achievements = set(player_data['achievements'])
+            self._achievements_list = list(player_data['achievements'])
+            self.achievements = set(self._achievements_list)
             
             # Questy
             self._load_quests(player_data['quests'])
             
             # Pozostałe dane
             self.player_stats = player_data['player_stats']
-            self.known_locations = set(player_data['known_locations'])
-            self.quest_log = player_data['quest_log']
+            self._known_locations_list = list(player_data['known_locations'])
+            self.known_locations = set(self._known_locations_list)
+            self.quest_log = _load_quest_log(player_data['quest_log'])
+            self._serialized = None
             
             # Stan gry
             game_state = save_data['game_state']
@@ -741,18 +869,22 @@ class Player(Character):
 
     def _load_quests(self, quest_data: dict):
         """Ładuje stan questów."""
-        self.active_quests = []
+        self.active_quests = {}
         self.completed_quests = []
+        self._completed_quest_ids = set()
+        self._quests_by_event = defaultdict(dict)
+        self._serialized = None
         
         for quest_id in quest_data['active']:
             quest = self.quest_manager.get_quest(quest_id)
             if quest:
-                self.active_quests.append(quest)
+                self._add_active_quest(quest)
                 
         for quest_id in quest_data['completed']:
             quest = self.quest_manager.get_quest(quest_id)
             if quest:
                 self.completed_quests.append(quest)
+                self._completed_quest_ids.add(quest_id)
                 
     def get_loot(self) -> List[dict]:
         """Zwraca łup z gracza (w przypadku śmierci)."""
@@ -769,14 +901,18 @@ class Player(Character):
     
         # Dodaj losowe przedmioty z ekwipunku
         if self.inventory and self.inventory.items:
-            for item_id, quantity in self.inventory.items.items():
-                # 10% szansa na upuszczenie każdego przedmiotu
-                if random.random() < 0.1:
-                    drop_quantity = min(quantity, random.randint(1, quantity))
-                    loot.append({
-                        'id': item_id,
-                        'amount': drop_quantity
-                    })
+            items = list(self.inventory.items.items())
+            rand = random.random
+            randint = random.randint
+            # Każdy przedmiot wypada z szansą _LOOT_DROP_CHANCE. Zamiast losować
+            # dla każdego z nich, losujemy odstęp do następnego upuszczonego
+            # (rozkład geometryczny: floor(ln(1 - U) / ln(1 - p))), więc liczba
+            # losowań zależy od liczby upuszczonych, a nie wszystkich przedmiotów
+            index = int(math.log(1.0 - rand()) / _LOG_LOOT_MISS)
+            while index < len(items):
+                item_id, quantity = items[index]
+                loot.append({'id': item_id, 'amount': randint(1, quantity)})
+                index += 1 + int(math.log(1.0 - rand()) / _LOG_LOOT_MISS)
     
         return loot
     
@@ -790,37 +926,31 @@ class Player(Character):
         if not self.quest_manager:
             return False, "System questów nie został zainicjalizowany!"
             
-        if quest_id in [quest.id for quest in self.active_quests]:
+        if quest_id in self.active_quests:
             return False, "Ten quest jest już aktywny!"
             
         quest = self.quest_manager.get_quest(quest_id)
         if not quest:
             return False, "Nie znaleziono questa!"
             
-        self.active_quests.append(quest)
-        self.quest_log.append({
-            'timestamp': time.time(),
-            'type': 'quest_accepted',
-            'quest_id': quest_id,
-            'quest_name': quest.name
-        })
+        self._add_active_quest(quest)
+        self.quest_log.append(QuestLogEntry(
+            _log_timestamp(), 'quest_accepted', quest_id, quest.name
+        ))
         
         return True, f"Przyjęto quest: {quest.name}"
 
     def complete_quest(self, quest_id: str) -> tuple[bool, str]:
         """Kończy quest."""
-        quest = next((q for q in self.active_quests if q.id == quest_id), None)
+        quest = self._remove_active_quest(quest_id)
         if not quest:
             return False, "Ten quest nie jest aktywny!"
             
-        self.active_quests.remove(quest)
         self.completed_quests.append(quest)
-        self.quest_log.append({
-            'timestamp': time.time(),
-            'type': 'quest_completed',
-            'quest_id': quest_id,
-            'quest_name': quest.name
-        })
+        self._completed_quest_ids.add(quest_id)
+        self.quest_log.append(QuestLogEntry(
+            _log_timestamp(), 'quest_completed', quest_id, quest.name
+        ))
         
         return True, f"Ukończono quest: {quest.name}!"
 
@@ -836,7 +966,7 @@ class Player(Character):
         if not self.quest_manager:
             return
             
-        for quest in self.active_quests:
+        for quest in list(self._quests_by_event.get(event_type, {}).values()):
             if quest.check_objective(event_type, target_id):
                 quest.update_progress(amount)
                 if quest.is_completed():
@@ -844,10 +974,14 @@ class Player(Character):
 
     # Dodanie serializacji stanu gracza
     def serialize(self) -> dict:
-        return {
-            'id': self.id,
-            'name': self.name,
-            'active_quests': self.serialize_quests(),
-            'completed_quests': [q.id for q in self.completed_quests],
-            'quest_log': self.quest_log
-        }
\ No newline at end of file
+        # Dziennik questów jest tylko uzupełniany, więc zapamiętany słownik
+        # współdzieli z graczem tę samą listę i nie wymaga unieważnienia
+        if self._serialized is None:
+            self._serialized = {
+                'id': self.id,
+                'name': self.name,
+                'active_quests': list(self.active_quests),
+                'completed_quests': [q.id for q in self.completed_quests],
+                'quest_log': self.quest_log
+            }
+        return self._serialized
\ No newline at end of file
@@ -1,15 +1,27 @@
 # quests.py
+import copy
 import json
-from typing import Dict, List, Optional
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 class Quest:
+    __slots__ = (
+        'id', 'name', 'description', 'giver', 'type', 'difficulty', 'min_level',
+        'stages', 'rewards', 'current_stage', 'completed', 'active', 'failed',
+        'time_limit', 'repeatable', 'cooldown', 'prerequisites', 'choices',
+        'failure_penalties', '_serialized'
+    )
+
+    # Pola zmieniające się w trakcie gry; pozostałe pochodzą z danych questa
+    _RUNTIME_FIELDS = ('current_stage', 'completed', 'active', 'failed', 'choices')
+
     def __init__(self, quest_id: str, data: dict):
         self.id = quest_id
         self.name = data['name']
         self.description = data['description']
-        self.giver = data['giver']
-        self.type = data['type']
-        self.difficulty = data['difficulty']
+        self.giver = sys.intern(data['giver'])
+        self.type = sys.intern(data['type'])
+        self.difficulty = sys.intern(data['difficulty'])
         self.min_level = data.get('min_level', 1)
         self.stages = data['stages']
         self.rewards = data['rewards']
@@ -23,6 +35,8 @@ class Quest:
         self.prerequisites = data.get('prerequisites', {})
         self.choices = []
         self.failure_penalties = data.get('failure_penalties', {})
+        # Stan zapamiętany przy ukończeniu - ukończony quest już się nie zmienia
+        self._serialized = None
 
     def start(self):
         """Rozpoczyna quest."""
@@ -43,6 +57,7 @@ class Quest:
         """Kończy quest jako ukończony."""
         self.completed = True
         self.active = False
+        self._serialized = self.serialize()
         return "Quest ukończony! Odbierz nagrody."
 
     def fail(self):
@@ -77,12 +92,41 @@ class Quest:
             return stage['description']
         return ""
 
+    def serialize(self) -> dict:
+        """Zwraca zmienny stan questa do zapisu."""
+        return {
+            'id': self.id,
+            'current_stage': self.current_stage,
+            'completed': self.completed,
+            'active': self.active,
+            'failed': self.failed,
+            'choices': list(self.choices)
+        }
+
+    @classmethod
+    def restore(cls, blueprint: 'Quest', state: dict) -> 'Quest':
+        """Tworzy quest z nieużywanego wzorca, nakładając zapisany stan."""
+        quest = copy.copy(blueprint)
+        for field in cls._RUNTIME_FIELDS:
+            setattr(quest, field, state.get(field, getattr(blueprint, field)))
+        quest.choices = list(quest.choices)
+        quest._serialized = state if quest.completed else None
+        return quest
+
 class QuestManager:
     def __init__(self, data_file='data/quests.json'):
+        # Obiekty Quest powstają dopiero przy pierwszym użyciu (get_quest)
         self.quests: Dict[str, Quest] = {}
+        self._quest_raw: Dict[str, dict] = {}
+        # Nieużywane wzorce questów, kopiowane przy wczytywaniu stanu gry
+        self._blueprints: Dict[str, Quest] = {}
         self.active_quests: List[Quest] = []
         self.completed_quests: List[Quest] = []
+        self.quest_log: List[dict] = []
         self.quest_dependencies: Dict[str, List[str]] = {}  # Dodać zależności między questami
+        self._quests_by_giver: Dict[str, List[str]] = {}
+        # (cel, obiekt) aktualnego etapu -> aktywne questy czekające na to wydarzenie
+        self._event_index: Dict[Tuple[str, str], List[Quest]] = {}
         self.load_quests(data_file)
         
     def validate_quest_data(self, quest_data: dict) -> bool:
@@ -96,17 +140,41 @@ class QuestManager:
             with open(data_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
                 for quest_id, quest_data in data['quests'].items():
-                    self.quests[quest_id] = Quest(quest_id, quest_data)
+                    self._quest_raw[quest_id] = quest_data
+                    giver = sys.intern(quest_data['giver'])
+                    self._quests_by_giver.setdefault(giver, []).append(quest_id)
         except FileNotFoundError:
             print(f"Błąd: Nie znaleziono pliku {data_file}")
         except json.JSONDecodeError:
             print(f"Błąd: Nieprawidłowy format pliku {data_file}")
 
-    def get_available_quests(self, player, location: str) -> List[Quest]:
-        """Zwraca listę questów dostępnych w danej lokacji dla gracza."""
+    def get_quest(self, quest_id: str) -> Optional[Quest]:
+        """Zwraca quest o podanym ID, tworząc go przy pierwszym użyciu."""
+        quest = self.quests.get(quest_id)
+        if quest is None:
+            quest_data = self._quest_raw.get(quest_id)
+            if quest_data is None:
+                return None
+            quest = self.quests[quest_id] = Quest(quest_id, quest_data)
+        return quest
+
+    def get_available_quests(self, player,
+                             givers: Union[str, Iterable[str], None] = None) -> List[Quest]:
+        """Zwraca listę questów dostępnych dla gracza u podanego NPC (lub NPC w lokacji)."""
+        if givers is None:
+            quest_ids = list(self._quest_raw)
+        elif isinstance(givers, str):
+            quest_ids = self._quests_by_giver.get(givers, ())
+        else:
+            quest_ids = [
+                quest_id for giver in givers
+                for quest_id in self._quests_by_giver.get(giver, ())
+            ]
+            
         available_quests = []
-        for quest in self.quests.values():
-            if not quest.active and not quest.completed and quest.giver in location:
+        for quest_id in quest_ids:
+            quest = self.get_quest(quest_id)
+            if not quest.active and not quest.completed:
                 can_start, _ = quest.can_start(player)
                 if can_start:
                     available_quests.append(quest)
@@ -114,11 +182,10 @@ class QuestManager:
 
     def start_quest(self, quest_id: str, player) -> tuple[bool, str]:
         """Rozpoczyna quest dla gracza."""
-        if quest_id not in self.quests:
+        quest = self.get_quest(quest_id)
+        if not quest:
             return False, "Nie znaleziono questa!"
         
-        quest = self.quests[quest_id]
-        
         if quest.active:
             return False, "Ten quest jest już aktywny!"
             
@@ -131,34 +198,55 @@ class QuestManager:
             
         quest.start()
         self.active_quests.append(quest)
+        self._watch_quest(quest)
         return True, f"Rozpoczęto quest: {quest.name}"
 
     def update_quest_progress(self, player, event_type: str, target: str, count: int = 1) -> List[str]:
         """Aktualizuje postęp questów na podstawie wydarzeń w grze."""
         messages = []
-        for quest in self.active_quests:
+        for quest in list(self._event_index.get((event_type, target), ())):
             stage = quest.get_current_stage()
-            if stage['objective'] == event_type and stage['target'] == target:
-                # Sprawdź czy jest wymagana liczba
-                if 'count' in stage:
-                    if count >= stage['count']:
-                        success, message = quest.advance_stage()
-                        messages.append(message)
-                        if not success:  # Quest ukończony
-                            self.complete_quest(quest.id, player)
-                else:
-                    success, message = quest.advance_stage()
-                    messages.append(message)
-                    if not success:  # Quest ukończony
-                        self.complete_quest(quest.id, player)
+            # Sprawdź czy jest wymagana liczba
+            if 'count' in stage and count < stage['count']:
+                continue
+                
+            self._unwatch_quest(quest)
+            success, message = quest.advance_stage()
+            messages.append(message)
+            if success:
+                self._watch_quest(quest)
+            else:  # Quest ukończony
+                self.complete_quest(quest.id, player)
         return messages
 
+    def _get_event_key(self, quest: Quest) -> Optional[Tuple[str, str]]:
+        """Zwraca klucz wydarzenia, na które czeka aktualny etap questa."""
+        stage = quest.get_current_stage()
+        if 'objective' not in stage:
+            return None
+        return stage['objective'], stage.get('target')
+
+    def _watch_quest(self, quest: Quest):
+        """Rejestruje quest w indeksie wydarzeń dla jego aktualnego etapu."""
+        key = self._get_event_key(quest)
+        if key is not None:
+            self._event_index.setdefault(key, []).append(quest)
+
+    def _unwatch_quest(self, quest: Quest):
+        """Usuwa quest z indeksu wydarzeń."""
+        key = self._get_event_key(quest)
+        watchers = self._event_index.get(key)
+        if watchers and quest in watchers:
+            watchers.remove(quest)
+            if not watchers:
+                del self._event_index[key]
+
     def complete_quest(self, quest_id: str, player) -> tuple[bool, str]:
         """Kończy questa i przyznaje nagrody."""
-        if quest_id not in self.quests:
+        quest = self.get_quest(quest_id)
+        if not quest:
             return False, "Nie znaleziono questa!"
             
-        quest = self.quests[quest_id]
         if not quest.active:
             return False, "Ten quest nie jest aktywny!"
             
@@ -175,6 +263,7 @@ class QuestManager:
             for faction, value in rewards['reputation'].items():
                 player.add_reputation(faction, value)
                 
+        self._unwatch_quest(quest)
         quest.complete()
         self.active_quests.remove(quest)
         self.completed_quests.append(quest)
@@ -182,10 +271,10 @@ class QuestManager:
 
     def get_quest_status(self, quest_id: str) -> Optional[str]:
         """Zwraca status questa."""
-        if quest_id not in self.quests:
+        quest = self.get_quest(quest_id)
+        if not quest:
             return None
             
-        quest = self.quests[quest_id]
         if quest.completed:
             return "Ukończony"
         elif quest.failed:
@@ -195,10 +284,13 @@ class QuestManager:
         else:
             return "Dostępny"
 
-    def show_available_quests(self, player):
+    def show_available_quests(self, player, world):
         """Wyświetla dostępne questy."""
         print("\n=== Dostępne Questy ===")
-        available_quests = self.get_available_quests(player, player.current_location)
+        # Questy zleca NPC, więc szukamy ich u NPC obecnych w lokacji gracza
+        location = world.get_location(player.current_location)
+        givers = location.get_all_npcs() if location else ()
+        available_quests = self.get_available_quests(player, givers)
         if not available_quests:
             print("Brak dostępnych questów w tej lokacji.")
             return
@@ -233,15 +325,37 @@ class QuestManager:
 
     # Dodanie serializacji stanu questów
     def serialize_state(self) -> dict:
+        # Ukończone questy mają stan zapamiętany w chwili ukończenia
         return {
             'active_quests': [q.serialize() for q in self.active_quests],
-            'completed_quests': [q.serialize() for q in self.completed_quests],
+            'completed_quests': [q._serialized or q.serialize() for q in self.completed_quests],
             'quest_log': self.quest_log
         }
 
-    # Brak metody deserializacji stanu questów
     def load_state(self, state_data: dict):
         """Wczytuje stan questów z zapisanych danych."""
-        self.active_quests = [Quest(**data) for data in state_data.get('active_quests', [])]
-        self.completed_quests = [Quest(**data) for data in state_data.get('completed_quests', [])]
-        self.quest_log = state_data.get('quest_log', [])
\ No newline at end of file
+        # Questy spoza zapisu zostaną utworzone od nowa przy pierwszym użyciu
+        self.quests = {}
+        self.active_quests = self._load_quest_states(state_data.get('active_quests', []))
+        self.completed_quests = self._load_quest_states(state_data.get('completed_quests', []))
+        self.quest_log = state_data.get('quest_log', [])
+        
+        self._event_index = {}
+        for quest in self.active_quests:
+            self._watch_quest(quest)
+
+    def _load_quest_states(self, states: List[dict]) -> List[Quest]:
+        """Zwraca questy z przywróconym zapisanym stanem."""
+        quests = []
+        for data in states:
+            quest_id = data['id']
+            blueprint = self._blueprints.get(quest_id)
+            if blueprint is None:
+                quest_data = self._quest_raw.get(quest_id)
+                if quest_data is None:
+                    continue
+                blueprint = self._blueprints[quest_id] = Quest(quest_id, quest_data)
+                
+            quest = self.quests[quest_id] = Quest.restore(blueprint, data)
+            quests.append(quest)
+        return quests
\ No newline at end of file
@@ -1,15 +1,22 @@
 # save_load.py
 
-from typing import List, Optional, Tuple, Dict, Any, Union, Set
+from typing import Iterable, List, Optional, Tuple, Dict, Any, Union, Set
+import base64
+import binascii
 import json
 import os
 import time
 import zlib
-import base64
+import struct
 import logging
 from pathlib import Path
 from dataclasses import dataclass
 import hashlib
+import heapq
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import shutil
+from functools import partial
 from exceptions import (
     SaveLoadError, SaveFileCorruptedError, 
     SaveVersionMismatchError, GameStateError
@@ -18,7 +25,93 @@ from config import game_config
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Nagłówek binarnego pliku zapisu:
+# znacznik, wersja formatu, długość metadanych (JSON), suma kontrolna stanu gry.
+# Po nagłówku zapisane są metadane, a za nimi skompresowany stan gry.
+_SAVE_MAGIC = b'SAVE'
+_SAVE_FORMAT_VERSION = 1
+_SAVE_HEADER = struct.Struct('<4sHI32s')
+_CHECKSUM_OFFSET = _SAVE_HEADER.size - 32
+# Zapisy z poprzednich wersji gry to pliki JSON: metadane z sumą SHA-256
+# tekstu base64 oraz stan gry jako base64 ze skompresowanego JSON-a
+_LEGACY_SAVE_PREFIX = b'{'
+
+# Suma kontrolna służy tylko do wykrywania uszkodzeń, więc wystarcza szybki BLAKE2b.
+# Algorytm jest zapisywany w metadanych (pole 'hash_algo', wymagane).
+_HASH_ALGO = 'blake2b'
+# Po przekroczeniu _PARALLEL_COMPRESSION_MIN_BYTES reszta zapisu jest kompresowana
+# równolegle, w kawałkach po _COMPRESSION_CHUNK_SIZE bajtów. Każdy kawałek to
+# osobny blok deflate zakończony Z_SYNC_FLUSH, więc po sklejeniu (z nagłówkiem
+# i sumą adler32) powstaje zwykły strumień zlib.
+_PARALLEL_COMPRESSION_MIN_BYTES = 1 << 20
+_COMPRESSION_CHUNK_SIZE = 256 * 1024
+# Liczba kawałków kompresowanych jednocześnie na jeden wątek
+_COMPRESSION_CHUNKS_PER_THREAD = 2
+_ZLIB_HEADER = b'\x78\x9c'
+
+# Maksymalna liczba zapamiętanych nazw nieistniejących zapisów
+_MAX_MISSING_SAVES = 256
+
+_HASHERS = {
+    'blake2b': partial(hashlib.blake2b, digest_size=32),
+}
+
+
+# Zwarty koder JSON dla zapisów: bez spacji i bez escape'owania znaków spoza ASCII
+# (polskie znaki zajmują 2 bajty UTF-8 zamiast 6 bajtów \uXXXX). Stan gry nie
+# zawiera cykli, więc sprawdzanie odwołań cyklicznych jest wyłączone.
+_JSON_ENCODER = json.JSONEncoder(
+    separators=(',', ':'), ensure_ascii=False, check_circular=False
+)
+_encode_json = _JSON_ENCODER.encode
+
+
+def _iter_json_sections(data: dict):
+    """Zwraca tekst JSON słownika kawałkami, osobno dla każdej sekcji najwyższego poziomu."""
+    # W pamięci nie powstaje pełny tekst JSON całego stanu gry, a każda
+    # sekcja jest nadal serializowana szybkim, jednorazowym wywołaniem kodera
+    yield '{'
+    for index, (key, value) in enumerate(data.items()):
+        if index:
+            yield ','
+        yield _encode_json(key) + ':' + _encode_json(value)
+    yield '}'
+
+
+def _iter_chunks(sections: Iterable[bytes], chunk_size: int):
+    """Dzieli i skleja sekcje w kawałki o rozmiarze chunk_size (ostatni może być mniejszy)."""
+    pending = []
+    pending_size = 0
+    for section in sections:
+        view = memoryview(section)
+        while view:
+            part = view[:chunk_size - pending_size]
+            view = view[len(part):]
+            pending.append(part)
+            pending_size += len(part)
+            if pending_size == chunk_size:
+                yield b''.join(pending)
+                pending = []
+                pending_size = 0
+    if pending:
+        yield b''.join(pending)
+
+
+class _HashingWriter:
+    """Przekazuje dane do pliku, aktualizując po drodze sumę kontrolną."""
+
+    def __init__(self, file):
+        self._file = file
+        self._hash = _HASHERS[_HASH_ALGO]()
+
+    def write(self, data: bytes):
+        self._hash.update(data)
+        self._file.write(data)
+
+    def digest(self) -> bytes:
+        return self._hash.digest()
+
+@dataclass(slots=True)
 class SaveMetadata:
     """Reprezentuje metadane zapisu gry."""
     name: str
@@ -28,6 +121,18 @@ class SaveMetadata:
     level: int
     play_time: float
 
+    @classmethod
+    def from_dict(cls, metadata: dict) -> 'SaveMetadata':
+        """Tworzy obiekt na podstawie metadanych zapisanych w pliku."""
+        return cls(
+            name=metadata['save_name'],
+            timestamp=metadata['timestamp'],
+            version=metadata['version'],
+            player_name=metadata['player_name'],
+            level=metadata['player_level'],
+            play_time=metadata['playtime']
+        )
+
 class SaveManager:
     """Zarządza zapisem i odczytem stanu gry."""
     
@@ -40,8 +145,19 @@ class SaveManager:
         self.max_autosaves = game_config.get('game_settings.max_autosaves', 3)
         self.save_directory = Path("saves")
         self.save_directory.mkdir(exist_ok=True)
-        self.compression_level = 9
         self.max_saves = 100  # Dodać limit zapisów
+        # Metadane zapisów według ścieżki, ważne dopóki nie zmieni się mtime pliku
+        self._meta_cache: Dict[Path, Tuple[float, SaveMetadata]] = {}
+        # Nazwy zapisów, których nie ma na dysku, oraz pliki z błędnymi metadanymi (z mtime)
+        self._missing: Set[str] = set()
+        self._bad_files: Dict[Path, float] = {}
+        # Kopce (mtime, ścieżka) autosave'ów i kopii zapasowych, wczytywane przy pierwszym użyciu
+        self._autosaves: Optional[List[Tuple[float, Path]]] = None
+        self._backups: Optional[List[Tuple[float, Path]]] = None
+        self.compression_threads = game_config.get(
+            'game_settings.save_compression_threads', os.cpu_count() or 1
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
         
     def save_game(self, game_state: dict, save_name: str = None) -> Tuple[bool, str]:
         """Zapisuje stan gry do pliku."""
@@ -57,17 +173,18 @@ class SaveManager:
             
             # Zapisz plik
             self._write_save_file(save_path, save_data)
+            self._missing.discard(save_name)
             
             # Aktualizuj metadane
             self._update_save_metadata(save_name, save_data)
             
             # Zarządzaj automatycznymi zapisami
             if save_name.startswith('autosave'):
-                self._manage_autosaves()
+                self._manage_autosaves(save_path)
             
             # Utwórz kopię zapasową jeśli potrzeba
             if self.auto_backup and not save_name.startswith('autosave'):
-                self._create_backup(save_data)
+                self._create_backup(save_path)
                 
             logger.info(f"Gra została zapisana do: {save_path}")
             return True, "Gra została pomyślnie zapisana!"
@@ -80,25 +197,33 @@ class SaveManager:
         """Wczytuje stan gry z pliku."""
         try:
             save_path = self.save_dir / f"{save_name}.sav"
-            if not save_path.exists():
+            if not self._save_exists(save_name):
                 return False, "Nie znaleziono pliku zapisu!", None
                 
-            # Wczytaj i zdekoduj dane
+            # Wczytaj dane
             save_data = self._read_save_file(save_path)
             
+            # Sprawdź kompatybilność wersji (same metadane - przed haszowaniem stanu gry)
+            if not self._check_version_compatibility(save_data['metadata']['version']):
+                raise SaveVersionMismatchError("Niekompatybilna wersja zapisu!")
+                
             # Sprawdź integralność danych
             if not self._verify_save_integrity(save_data):
                 raise SaveFileCorruptedError("Plik zapisu jest uszkodzony!")
                 
-            # Sprawdź kompatybilność wersji
-            if not self._check_version_compatibility(save_data['metadata']['version']):
-                raise SaveVersionMismatchError("Niekompatybilna wersja zapisu!")
-                
+            # Zapis w starym formacie JSON jest jednorazowo przepisywany do nowego
+            if save_data.pop('legacy', False):
+                self._write_save_file(save_path, save_data)
+                self._update_save_metadata(save_name, save_data)
+            
+            # Zdekompresuj stan gry
+            game_state = self._decompress_data(save_data['game_state'])
+            
             # Ustaw aktualny zapis
             self.current_save = save_name
             
             logger.info(f"Wczytano grę z: {save_path}")
-            return True, "Gra została pomyślnie wczytana!", save_data['game_state']
+            return True, "Gra została pomyślnie wczytana!", game_state
             
         except SaveLoadError as e:
             logger.error(f"Błąd podczas wczytywania gry: {e}")
@@ -120,67 +245,222 @@ class SaveManager:
             'save_name': game_state.get('save_name', 'Unnamed Save'),
         }
         
-        # Skompresuj stan gry
-        compressed_state = self._compress_data(game_state)
-        
-        # Oblicz checksum
-        checksum = self._calculate_checksum(compressed_state)
-        metadata['checksum'] = checksum
-        
+        # Stan gry jest kompresowany i haszowany dopiero podczas zapisu pliku
         return {
             'metadata': metadata,
-            'game_state': compressed_state
+            'game_state': game_state
         }
 
+    def _save_exists(self, save_name: str) -> bool:
+        """Sprawdza czy zapis istnieje, pamiętając nazwy, których nie znaleziono."""
+        if save_name in self._missing:
+            return False
+        if (self.save_dir / f"{save_name}.sav").exists():
+            return True
+        if len(self._missing) >= _MAX_MISSING_SAVES:
+            self._missing.clear()
+        self._missing.add(save_name)
+        return False
+
+    def _update_save_metadata(self, save_name: str, save_data: dict):
+        """Aktualizuje pamięć podręczną metadanych po zapisaniu pliku."""
+        save_path = self.save_dir / f"{save_name}.sav"
+        self._meta_cache[save_path] = (
+            save_path.stat().st_mtime,
+            SaveMetadata.from_dict(save_data['metadata'])
+        )
+
     def _write_save_file(self, save_path: Path, save_data: dict):
-        """Zapisuje dane do pliku."""
+        """Zapisuje dane do pliku binarnego (nagłówek, metadane, stan gry)."""
+        # Plik powstaje obok docelowego i podmienia go dopiero po pełnym zapisie,
+        # więc przerwany zapis nie zostawia uszkodzonego pliku .sav
+        tmp_path = save_path.with_name(save_path.name + '.tmp')
+        game_state = save_data['game_state']
+        raw_body = isinstance(game_state, bytes)
         try:
-            with save_path.open('w', encoding='utf-8') as f:
-                json.dump(save_data, f, indent=4)
+            metadata = dict(save_data['metadata'])
+            checksum = metadata.pop('checksum', None)
+            if raw_body:
+                # Skompresowany stan gry jest kopiowany bez zmian razem z sumą kontrolną
+                checksum = bytes.fromhex(checksum)
+            else:
+                metadata['hash_algo'] = _HASH_ALGO
+            metadata_bytes = _encode_json(metadata).encode('utf-8')
+            
+            with tmp_path.open('wb') as f:
+                # Suma kontrolna nowego stanu gry jest uzupełniana po jego zapisaniu
+                f.write(_SAVE_HEADER.pack(
+                    _SAVE_MAGIC, _SAVE_FORMAT_VERSION, len(metadata_bytes),
+                    checksum if raw_body else bytes(32)
+                ))
+                f.write(metadata_bytes)
+                
+                if raw_body:
+                    f.write(game_state)
+                else:
+                    writer = _HashingWriter(f)
+                    self._compress_data(game_state, writer)
+                    
+                    checksum = writer.digest()
+                    f.seek(_CHECKSUM_OFFSET)
+                    f.write(checksum)
+                    
+                f.flush()
+                os.fsync(f.fileno())
+                
+            os.replace(tmp_path, save_path)
+            save_data['metadata']['checksum'] = checksum.hex()
+            save_data['metadata']['hash_algo'] = metadata['hash_algo']
         except Exception as e:
+            tmp_path.unlink(missing_ok=True)
             raise SaveLoadError(f"Nie można zapisać pliku: {e}")
 
+    def _read_save_header(self, f) -> dict:
+        """Odczytuje nagłówek i metadane z otwartego pliku zapisu."""
+        header = f.read(_SAVE_HEADER.size)
+        if len(header) != _SAVE_HEADER.size:
+            raise SaveFileCorruptedError("Plik zapisu jest uszkodzony!")
+            
+        magic, format_version, metadata_size, checksum = _SAVE_HEADER.unpack(header)
+        if magic != _SAVE_MAGIC:
+            raise SaveFileCorruptedError("Nieprawidłowy format pliku zapisu!")
+        if format_version != _SAVE_FORMAT_VERSION:
+            raise SaveVersionMismatchError("Nieobsługiwana wersja formatu zapisu!")
+            
+        metadata = json.loads(f.read(metadata_size))
+        if metadata.get('hash_algo') not in _HASHERS:
+            raise SaveFileCorruptedError("Nieznany algorytm sumy kontrolnej zapisu!")
+        metadata['checksum'] = checksum.hex()
+        return metadata
+
+    def _read_save_metadata(self, f) -> dict:
+        """Odczytuje metadane z otwartego pliku zapisu (również w starym formacie JSON)."""
+        if f.read(1) == _LEGACY_SAVE_PREFIX:
+            f.seek(0)
+            return json.load(f)['metadata']
+        f.seek(0)
+        return self._read_save_header(f)
+
+    def _read_legacy_save_file(self, f) -> dict:
+        """Wczytuje zapis w starym formacie JSON, sprowadzając go do postaci nowego formatu."""
+        save_data = json.load(f)
+        metadata = save_data['metadata']
+        encoded_state = save_data['game_state']
+        if hashlib.sha256(encoded_state.encode()).hexdigest() != metadata['checksum']:
+            raise SaveFileCorruptedError("Plik zapisu jest uszkodzony!")
+            
+        compressed_state = base64.b64decode(encoded_state)
+        metadata['hash_algo'] = _HASH_ALGO
+        metadata['checksum'] = self._calculate_checksum(compressed_state)
+        return {
+            'metadata': metadata,
+            'game_state': compressed_state,
+            'legacy': True
+        }
+
     def _read_save_file(self, save_path: Path) -> dict:
-        """Wczytuje dane z pliku."""
+        """Wczytuje dane z pliku. Stan gry pozostaje skompresowany."""
         try:
-            with save_path.open('r', encoding='utf-8') as f:
-                save_data = json.load(f)
+            with save_path.open('rb') as f:
+                if f.read(1) == _LEGACY_SAVE_PREFIX:
+                    f.seek(0)
+                    return self._read_legacy_save_file(f)
+                f.seek(0)
+                metadata = self._read_save_header(f)
+                compressed_state = f.read()
                 
-            # Zdekompresuj stan gry
-            save_data['game_state'] = self._decompress_data(save_data['game_state'])
-            return save_data
+            return {
+                'metadata': metadata,
+                'game_state': compressed_state
+            }
             
-        except json.JSONDecodeError:
+        except SaveLoadError:
+            raise
+        except (json.JSONDecodeError, UnicodeDecodeError, binascii.Error, KeyError):
             raise SaveFileCorruptedError("Plik zapisu jest uszkodzony!")
         except Exception as e:
             raise SaveLoadError(f"Nie można wczytać pliku: {e}")
 
-    def _compress_data(self, data: dict) -> str:
-        """Kompresuje dane gry."""
+    def _compress_data(self, data: dict, out):
+        """Kompresuje dane gry sekcja po sekcji, zapisując je do out."""
         try:
-            json_str = json.dumps(data)
-            compressed = zlib.compress(json_str.encode(), self.compression_level)
-            return base64.b64encode(compressed).decode()
+            # Surowy strumień deflate z własnym nagłówkiem i sumą adler32, aby
+            # po przekroczeniu progu dalszą część można było kompresować równolegle
+            compressor = zlib.compressobj(
+                self.compression_level, zlib.DEFLATED, -zlib.MAX_WBITS, 9
+            )
+            sections = (section.encode('utf-8') for section in _iter_json_sections(data))
+            parallel = self.compression_threads > 1
+            if parallel:
+                # Duża sekcja (np. stan świata) jest dzielona, więc jej część
+                # ponad progiem również trafia do kompresji równoległej
+                sections = _iter_chunks(sections, _COMPRESSION_CHUNK_SIZE)
+            checksum = 1
+            size = 0
+            
+            out.write(_ZLIB_HEADER)
+            for section in sections:
+                checksum = zlib.adler32(section, checksum)
+                out.write(compressor.compress(section))
+                size += len(section)
+                if parallel and size >= _PARALLEL_COMPRESSION_MIN_BYTES:
+                    out.write(compressor.flush(zlib.Z_SYNC_FLUSH))
+                    checksum = self._compress_parallel(sections, out, checksum)
+                    break
+            else:
+                out.write(compressor.flush())
+            out.write(struct.pack('>I', checksum))
         except Exception as e:
             raise SaveLoadError(f"Błąd kompresji danych: {e}")
 
-    def _decompress_data(self, compressed_data: str) -> dict:
+    def _compress_parallel(self, chunks: Iterable[bytes], out, checksum: int) -> int:
+        """Kompresuje pozostałe kawałki w wielu wątkach (zlib zwalnia GIL), zwraca sumę adler32."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.compression_threads)
+            
+        # W pamięci jest tylko ograniczona liczba kawałków w trakcie kompresji
+        max_pending = self.compression_threads * _COMPRESSION_CHUNKS_PER_THREAD
+        pending = deque()
+        for chunk in chunks:
+            checksum = zlib.adler32(chunk, checksum)
+            pending.append(
+                self._executor.submit(self._compress_chunk, chunk, zlib.Z_SYNC_FLUSH)
+            )
+            if len(pending) >= max_pending:
+                out.write(pending.popleft().result())
+        while pending:
+            out.write(pending.popleft().result())
+            
+        # Pusty blok kończący strumień deflate
+        out.write(self._compress_chunk(b'', zlib.Z_FINISH))
+        return checksum
+
+    def _compress_chunk(self, chunk: bytes, flush_mode: int) -> bytes:
+        """Kompresuje jeden kawałek jako surowy blok deflate."""
+        compressor = zlib.compressobj(
+            self.compression_level, zlib.DEFLATED, -zlib.MAX_WBITS, 9
+        )
+        return compressor.compress(chunk) + compressor.flush(flush_mode)
+
+    def _decompress_data(self, compressed_data: bytes) -> dict:
         """Dekompresuje dane gry."""
         try:
-            compressed = base64.b64decode(compressed_data)
-            json_str = zlib.decompress(compressed).decode()
-            return json.loads(json_str)
+            return json.loads(zlib.decompress(compressed_data))
         except Exception as e:
             raise SaveLoadError(f"Błąd dekompresji danych: {e}")
 
-    def _calculate_checksum(self, data: str) -> str:
+    def _calculate_checksum(self, data: bytes, hash_algo: str = _HASH_ALGO) -> str:
         """Oblicza sumę kontrolną danych."""
-        return hashlib.sha256(data.encode()).hexdigest()
+        return _HASHERS[hash_algo](data).hexdigest()
 
     def _verify_save_integrity(self, save_data: dict) -> bool:
         """Sprawdza integralność pliku zapisu."""
-        stored_checksum = save_data['metadata']['checksum']
-        calculated_checksum = self._calculate_checksum(save_data['game_state'])
+        metadata = save_data['metadata']
+        hash_algo = metadata['hash_algo']
+        if hash_algo not in _HASHERS:
+            return False
+        stored_checksum = metadata['checksum']
+        calculated_checksum = self._calculate_checksum(save_data['game_state'], hash_algo)
         return stored_checksum == calculated_checksum
 
     def _check_version_compatibility(self, save_version: str) -> bool:
@@ -190,7 +470,7 @@ class SaveManager:
         current_major_version = int(current_version.split('.')[0])
         return save_major_version == current_major_version
 
-    def _create_backup(self, save_data: dict):
+    def _create_backup(self, save_path: Path):
         """Tworzy kopię zapasową zapisu."""
         try:
             backup_dir = self.save_dir / 'backups'
@@ -199,43 +479,64 @@ class SaveManager:
             timestamp = int(time.time())
             backup_path = backup_dir / f"backup_{timestamp}.sav"
             
-            self._write_save_file(backup_path, save_data)
+            shutil.copyfile(save_path, backup_path)
             logger.info(f"Utworzono kopię zapasową: {backup_path}")
             
             # Usuń stare kopie zapasowe
-            self._cleanup_old_backups()
+            self._cleanup_old_backups(backup_path)
             
         except Exception as e:
             logger.error(f"Nie udało się utworzyć kopii zapasowej: {e}")
 
-    def _manage_autosaves(self):
+    @staticmethod
+    def _load_file_heap(directory: Path, pattern: str) -> List[Tuple[float, Path]]:
+        """Tworzy kopiec (mtime, ścieżka) plików pasujących do wzorca."""
+        heap = [(path.stat().st_mtime, path) for path in directory.glob(pattern)]
+        heapq.heapify(heap)
+        return heap
+
+    @staticmethod
+    def _push_file(heap: List[Tuple[float, Path]], path: Path):
+        """Dodaje właśnie zapisany plik do kopca, zastępując jego poprzedni wpis."""
+        if any(entry[1] == path for entry in heap):
+            heap[:] = [entry for entry in heap if entry[1] != path]
+            heapq.heapify(heap)
+        heapq.heappush(heap, (path.stat().st_mtime, path))
+
+    def _forget_autosave(self, save_path: Path):
+        """Usuwa plik z kopca autosave'ów (po usunięciu lub zmianie nazwy)."""
+        if self._autosaves and any(entry[1] == save_path for entry in self._autosaves):
+            self._autosaves = [entry for entry in self._autosaves if entry[1] != save_path]
+            heapq.heapify(self._autosaves)
+
+    def _manage_autosaves(self, save_path: Path):
         """Zarządza automatycznymi zapisami."""
-        autosaves = sorted([
-            f for f in self.save_dir.glob("autosave_*.sav")
-        ], key=lambda f: f.stat().st_mtime, reverse=True)
+        if self._autosaves is None:
+            self._autosaves = self._load_file_heap(self.save_dir, "autosave_*.sav")
+        else:
+            self._push_file(self._autosaves, save_path)
         
         # Usuń najstarsze autosave'y jeśli przekroczono limit
-        while len(autosaves) > self.max_autosaves:
-            autosave_to_remove = autosaves.pop()
+        while len(self._autosaves) > self.max_autosaves:
+            _, autosave_to_remove = heapq.heappop(self._autosaves)
             try:
                 autosave_to_remove.unlink()
                 logger.info(f"Usunięto stary autosave: {autosave_to_remove}")
             except Exception as e:
                 logger.error(f"Nie udało się usunąć autosave'a: {e}")
 
-    def _cleanup_old_backups(self):
+    def _cleanup_old_backups(self, backup_path: Path):
         """Usuwa stare kopie zapasowe."""
-        backup_dir = self.save_dir / 'backups'
-        if not backup_dir.exists():
-            return
+        if self._backups is None:
+            self._backups = self._load_file_heap(backup_path.parent, "backup_*.sav")
+        else:
+            self._push_file(self._backups, backup_path)
             
         max_backups = game_config.get('game_settings.max_backups', 5)
-        backups = sorted([
-            f for f in backup_dir.glob("backup_*.sav")
-        ], key=lambda f: f.stat().st_mtime, reverse=True)
         
         # Usuń najstarsze kopie zapasowe
-        for backup in backups[max_backups:]:
+        while len(self._backups) > max_backups:
+            _, backup = heapq.heappop(self._backups)
             try:
                 backup.unlink()
                 logger.info(f"Usunięto starą kopię zapasową: {backup}")
@@ -245,25 +546,45 @@ class SaveManager:
     def get_save_list(self) -> List[SaveMetadata]:
         """Zwraca listę dostępnych zapisów."""
         saves = []
+        meta_cache = {}
         for save_path in self.save_dir.glob("*.sav"):
             try:
-                with save_path.open('r', encoding='utf-8') as f:
-                    save_data = json.load(f)
-                    metadata = SaveMetadata(**save_data['metadata'])
-                    saves.append(metadata)
+                mtime = save_path.stat().st_mtime
+                # Uszkodzony plik jest pomijany, dopóki nie zostanie nadpisany
+                if self._bad_files.get(save_path) == mtime:
+                    continue
+                cached = self._meta_cache.get(save_path)
+                if cached is not None and cached[0] == mtime:
+                    save_metadata = cached[1]
+                else:
+                    # Wystarczy nagłówek - stan gry nie jest odczytywany
+                    with save_path.open('rb') as f:
+                        save_metadata = SaveMetadata.from_dict(self._read_save_metadata(f))
+                meta_cache[save_path] = (mtime, save_metadata)
+                saves.append(save_metadata)
             except Exception as e:
                 logger.error(f"Błąd podczas czytania metadanych zapisu {save_path}: {e}")
-                
+                try:
+                    self._bad_files[save_path] = save_path.stat().st_mtime
+                except OSError:
+                    pass
+        
+        # Wpisy usuniętych plików wypadają z pamięci podręcznej
+        self._meta_cache = meta_cache
         return sorted(saves, key=lambda x: x.timestamp, reverse=True)
 
     def delete_save(self, save_name: str) -> Tuple[bool, str]:
         """Usuwa plik zapisu."""
         try:
             save_path = self.save_dir / f"{save_name}.sav"
-            if not save_path.exists():
+            if not self._save_exists(save_name):
                 return False, "Nie znaleziono pliku zapisu!"
                 
             save_path.unlink()
+            self._forget_autosave(save_path)
+            self._meta_cache.pop(save_path, None)
+            self._bad_files.pop(save_path, None)
+            self._missing.add(save_name)
             logger.info(f"Usunięto zapis: {save_path}")
             return True, "Zapis został pomyślnie usunięty!"
             
@@ -277,21 +598,25 @@ class SaveManager:
             old_path = self.save_dir / f"{old_name}.sav"
             new_path = self.save_dir / f"{new_name}.sav"
             
-            if not old_path.exists():
+            if not self._save_exists(old_name):
                 return False, "Nie znaleziono pliku zapisu!"
                 
-            if new_path.exists():
+            if self._save_exists(new_name):
                 return False, "Plik o podanej nazwie już istnieje!"
                 
-            old_path.rename(new_path)
+            # Zapisz plik pod nową nazwą z nowymi metadanymi; stan gry
+            # jest przepisywany bez dekompresji
+            save_data = self._read_save_file(old_path)
+            save_data['metadata']['save_name'] = new_name
+            self._write_save_file(new_path, save_data)
+            old_path.unlink()
             
-            # Aktualizuj metadane
-            with new_path.open('r', encoding='utf-8') as f:
-                save_data = json.load(f)
-                save_data['metadata']['save_name'] = new_name
-                
-            with new_path.open('w', encoding='utf-8') as f:
-                json.dump(save_data, f, indent=4)
+            self._forget_autosave(old_path)
+            self._meta_cache.pop(old_path, None)
+            self._bad_files.pop(old_path, None)
+            self._missing.discard(new_name)
+            self._missing.add(old_name)
+            self._update_save_metadata(new_name, save_data)
                 
             logger.info(f"Zmieniono nazwę zapisu z {old_name} na {new_name}")
             return True, "Nazwa zapisu została pomyślnie zmieniona!"
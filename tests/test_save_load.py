@@ -0,0 +1,63 @@
+# tests/test_save_load.py
+
+import io
+import json
+import tempfile
+import unittest
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from save_load import SaveManager, _COMPRESSION_CHUNK_SIZE
+
+
+class _CountingExecutor(ThreadPoolExecutor):
+    """Pula wątków zliczająca zlecone zadania."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+class CompressDataTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.manager = SaveManager(self.tmp_dir.name)
+        self.manager.compression_threads = 4
+        self.manager._executor = _CountingExecutor(max_workers=4)
+
+    def tearDown(self):
+        self.manager._executor.shutdown()
+        self.tmp_dir.cleanup()
+
+    def _compress(self, data: dict) -> bytes:
+        out = io.BytesIO()
+        self.manager._compress_data(data, out)
+        return out.getvalue()
+
+    def test_single_large_section_is_compressed_in_parallel(self):
+        data = {'world_state': [f"lokacja_{i}" for i in range(250_000)]}
+        compressed = self._compress(data)
+
+        size = len(json.dumps(data, separators=(',', ':')))
+        self.assertGreaterEqual(size, 2 << 20)
+        self.assertGreater(self.manager._executor.submitted, 0)
+        # Kawałki ponad progiem 1 MB trafiają do puli wątków
+        self.assertGreaterEqual(
+            self.manager._executor.submitted, (size - (1 << 20)) // _COMPRESSION_CHUNK_SIZE
+        )
+        self.assertEqual(json.loads(zlib.decompress(compressed)), data)
+
+    def test_small_save_is_compressed_serially(self):
+        data = {'player': {'name': 'Zbyszek', 'level': 3}}
+        compressed = self._compress(data)
+
+        self.assertEqual(self.manager._executor.submitted, 0)
+        self.assertEqual(json.loads(zlib.decompress(compressed)), data)
+
+
+if __name__ == '__main__':
+    unittest.main()
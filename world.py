@@ -1,56 +1,266 @@
 # world.py
-from typing import Dict, List, Optional, Set
+from typing import Dict, Generator, List, Mapping, Optional, Set, Tuple
 import json
+import math
+from array import array
+import os
+import pickle
 import random
-from dataclasses import dataclass
+import sys
+import hashlib
+import heapq
+from bisect import bisect
+from itertools import accumulate
+from pathlib import Path
+from types import MappingProxyType
+from dataclasses import dataclass, field
 from config import game_config
+from exceptions import LocationError
 import logging
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Parser danych świata (bajty -> obiekty); orjson jest opcjonalny
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Funkcje losujące wywoływane w każdym cyklu aktualizacji (bez wyszukiwania atrybutu modułu)
+_rand = random.random
+_randint = random.randint
+
+# Liczba lokacji aktualizowanych w jednej porcji World.update_iter
+_UPDATE_CHUNK_SIZE = 64
+
+# Wersja formatu pamięci podręcznej świata - skrót kodu tego modułu, więc każda
+# zmiana klas zapisywanych picklem (Location, ResourceStore, ...) ją unieważnia
+_WORLD_CACHE_VERSION = hashlib.sha1(Path(__file__).read_bytes()).hexdigest()
+
+# Domyślny odstęp (w czasie gry) między kolejnymi próbami aktywacji wydarzenia
+_EVENT_CHECK_INTERVAL = 1.0
+
+# Rozmiar komórki siatki przestrzennej lokacji (w jednostkach współrzędnych mapy)
+_GRID_CELL_SIZE = 100.0
+
+
+# Dostępne typy pogody: opis i wpływ na rozgrywkę
+# (efekty są wspólne dla wszystkich lokacji, więc udostępniane tylko do odczytu)
+_WEATHER_TYPES = {
+    'sunny': {
+        'description': 'Słoneczna pogoda',
+        'effects': MappingProxyType({'visibility': 1.2, 'movement_speed': 1.1})
+    },
+    'rainy': {
+        'description': 'Pada deszcz',
+        'effects': MappingProxyType({'visibility': 0.8, 'movement_speed': 0.9})
+    },
+    'stormy': {
+        'description': 'Szaleje burza',
+        'effects': MappingProxyType(
+            {'visibility': 0.6, 'movement_speed': 0.7, 'combat_accuracy': 0.8}
+        )
+    }
+}
+# Prawdopodobieństwo poszczególnych typów pogody zależnie od typu lokacji
+_WEATHER_WEIGHTS = {
+    'neutral': {'sunny': 0.6, 'rainy': 0.3, 'stormy': 0.1},
+    'safe': {'sunny': 0.7, 'rainy': 0.25, 'stormy': 0.05},
+    'dangerous': {'sunny': 0.4, 'rainy': 0.35, 'stormy': 0.25},
+    'dungeon': {'sunny': 0.5, 'rainy': 0.3, 'stormy': 0.2}
+}
+# Typ lokacji -> (gotowe argumenty Weather: (typ, efekty, opis), skumulowane wagi)
+_WEATHER_TABLES = {
+    location_type: (
+        tuple(
+            (weather_type, _WEATHER_TYPES[weather_type]['effects'],
+             _WEATHER_TYPES[weather_type]['description'])
+            for weather_type in weights
+        ),
+        tuple(accumulate(weights.values()))
+    )
+    for location_type, weights in _WEATHER_WEIGHTS.items()
+}
+
+
+def _grid_cell(x: float, y: float) -> Tuple[int, int]:
+    """Zwraca komórkę siatki zawierającą punkt (x, y)."""
+    return int(x // _GRID_CELL_SIZE), int(y // _GRID_CELL_SIZE)
+
+@dataclass(slots=True)
 class Weather:
     """Klasa reprezentująca pogodę w lokacji."""
     type: str  # sunny, rainy, cloudy, stormy, etc.
     intensity: float  # 0.0 to 1.0
-    effects: Dict[str, float]  # wpływ na różne aspekty gry
+    effects: Mapping[str, float]  # wpływ na różne aspekty gry
     description: str
+    _formatted: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def format(self) -> str:
+        """Zwraca opis pogody z intensywnością (formatowany raz)."""
+        if self._formatted is None:
+            self._formatted = f"{self.description} (intensywność: {self.intensity:.1f})"
+        return self._formatted
+
+    def __reduce__(self):
+        # MappingProxyType nie daje się zapisać picklem - efekty są odtwarzane
+        # ze wspólnej tabeli typów pogody
+        return _restore_weather, (self.type, self.intensity, dict(self.effects), self.description)
+
+
+def _restore_weather(type: str, intensity: float, effects: dict, description: str) -> Weather:
+    """Odtwarza pogodę z pickla, współdzieląc efekty ze znanym typem pogody."""
+    weather_data = _WEATHER_TYPES.get(type)
+    if weather_data and weather_data['effects'] == effects:
+        effects = weather_data['effects']
+    return Weather(type, intensity, effects, description)
+
+class ResourceStore:
+    """Stan źródeł zasobów wszystkich lokacji świata w równoległych tablicach."""
+    
+    def __init__(self):
+        self.quantity = array('i')
+        self.respawn_time = array('i')  # w minutach
+        self.last_harvested = array('d')
+        # Indeksy wyczerpanych źródeł - tylko je trzeba sprawdzać przy odnawianiu
+        self.depleted: Set[int] = set()
+
+    def add(self, quantity: int, respawn_time: int, last_harvested: float = 0.0) -> int:
+        """Dodaje źródło zasobów i zwraca jego indeks."""
+        index = len(self.quantity)
+        self.quantity.append(quantity)
+        self.respawn_time.append(respawn_time)
+        self.last_harvested.append(last_harvested)
+        if quantity < 1:
+            self.depleted.add(index)
+        return index
+
+    def set_quantity(self, index: int, quantity: int):
+        """Ustawia ilość zasobu, aktualizując zbiór wyczerpanych źródeł."""
+        self.quantity[index] = quantity
+        if quantity < 1:
+            self.depleted.add(index)
+        else:
+            self.depleted.discard(index)
+
+    def respawn(self, game_time: float):
+        """Odnawia wyczerpane źródła, których czas odnowienia minął."""
+        if not self.depleted:
+            return
+        last_harvested = self.last_harvested
+        respawn_time = self.respawn_time
+        ready = [i for i in self.depleted if game_time - last_harvested[i] >= respawn_time[i]]
+        for index in ready:
+            self.quantity[index] = _randint(1, 3)
+            self.depleted.discard(index)
+
 
-@dataclass
 class ResourceNode:
-    """Klasa reprezentująca źródło zasobów w lokacji."""
-    type: str  # ore, herbs, wood, etc.
-    resource_id: str
-    quantity: int
-    respawn_time: int  # w minutach
-    last_harvested: float = 0.0
-    required_skill: Optional[str] = None
-    required_skill_level: int = 0
+    """Klasa reprezentująca źródło zasobów w lokacji (widok na ResourceStore)."""
+    __slots__ = ('_store', '_index', 'type', 'resource_id',
+                 'required_skill', 'required_skill_level', '_desc', '_desc_qty')
+    
+    def __init__(self, store: ResourceStore, type: str, resource_id: str,
+                 quantity: int, respawn_time: int, last_harvested: float = 0.0,
+                 required_skill: Optional[str] = None, required_skill_level: int = 0):
+        self._store = store
+        self._index = store.add(quantity, respawn_time, last_harvested)
+        self.type = type  # ore, herbs, wood, etc.
+        self.resource_id = resource_id
+        self.required_skill = required_skill
+        self.required_skill_level = required_skill_level
+        # Opis zasobu i ilość, dla której został sformatowany
+        self._desc = ''
+        self._desc_qty = -1
+
+    def describe(self) -> str:
+        """Zwraca opis zasobu, formatując go ponownie tylko po zmianie ilości."""
+        quantity = self._store.quantity[self._index]
+        if quantity != self._desc_qty:
+            self._desc = f"{self.type} (ilość: {quantity})"
+            self._desc_qty = quantity
+        return self._desc
+
+    @property
+    def quantity(self) -> int:
+        return self._store.quantity[self._index]
+
+    @quantity.setter
+    def quantity(self, value: int):
+        self._store.set_quantity(self._index, value)
+
+    @property
+    def respawn_time(self) -> int:
+        return self._store.respawn_time[self._index]
+
+    @respawn_time.setter
+    def respawn_time(self, value: int):
+        self._store.respawn_time[self._index] = value
+
+    @property
+    def last_harvested(self) -> float:
+        return self._store.last_harvested[self._index]
+
+    @last_harvested.setter
+    def last_harvested(self, value: float):
+        self._store.last_harvested[self._index] = value
 
 class Location:
-    def __init__(self, loc_id: str, data: dict):
-        self.id = loc_id
+    __slots__ = (
+        'id', 'name', 'description', 'items', 'exits', 'level_requirement',
+        'danger_level', 'type', 'position', 'weather', 'resources', '_resource_store',
+        'resource_range',
+        'discovered', 'events', '_event_heap', '_events_scheduled', 'npcs', 'enemies', 'buildings',
+        'quest_triggers', 'active_events', 'temporary_npcs', '_all_npcs',
+        'visited_count', 'last_visited'
+    )
+
+    def __init__(self, loc_id: str, data: dict, resource_store: Optional[ResourceStore] = None):
+        self.id = sys.intern(loc_id)
         self.name = data['name']
         self.description = data['description']
-        self.items = list(data.get('items', []))
-        self.exits = list(data.get('exits', []))
+        # Przedmioty leżące w lokacji: ID -> ilość (w kolejności pojawienia się)
+        self.items: Dict[str, int] = {}
+        for item_id in data.get('items', []):
+            self.items[item_id] = self.items.get(item_id, 0) + 1
+        self.exits = [sys.intern(exit_id) for exit_id in data.get('exits', ())]
         self.level_requirement = data.get('level_requirement', 1)
         self.danger_level = data.get('danger_level', 1)
         self.type = data.get('type', 'neutral')  # neutral, safe, dangerous, dungeon
-        self.npcs = npcs = data.get('npcs', []) # lista ID NPC w lokacji 
+        position = data.get('position')  # {'x': ..., 'y': ...} na mapie świata
+        self.position: Optional[Tuple[float, float]] = (
+            (position['x'], position['y']) if position else None
+        )
         # Zaawansowane właściwości
         self.weather: Optional[Weather] = None
         self.resources: List[ResourceNode] = []
+        # Wspólny magazyn zasobów świata; źródła tej lokacji zajmują w nim
+        # ciągły przedział indeksów resource_range = (początek, koniec)
+        self._resource_store = resource_store if resource_store is not None else ResourceStore()
+        self.resource_range = (0, 0)
         self.discovered = False
         self.events = data.get('events', [])
-        self.npcs = set(data.get('npcs', []))
-        self.enemies = set(data.get('enemies', []))
+        # Kopiec (czas następnego sprawdzenia, indeks w self.events) nieaktywnych wydarzeń;
+        # do pierwszej aktualizacji zawiera opóźnienia liczone od jej czasu gry
+        self._event_heap = [
+            (event_data.get('initial_delay', 0.0), index)
+            for index, event_data in enumerate(self.events)
+        ]
+        heapq.heapify(self._event_heap)
+        self._events_scheduled = False
+        self.npcs = {sys.intern(npc_id) for npc_id in data.get('npcs', ())}  # ID NPC w lokacji
+        self.enemies = set(data.get('enemies', ()))
         self.buildings = data.get('buildings', {})
         self.quest_triggers = data.get('quest_triggers', [])
         
         # Dynamiczne właściwości
         self.active_events = set()
         self.temporary_npcs = set()
+        # Wszyscy NPC w lokacji (stali i tymczasowi), aktualizowany przy każdej zmianie
+        self._all_npcs = set(self.npcs)
         self.visited_count = 0
         self.last_visited = 0.0
         
@@ -59,8 +269,10 @@ class Location:
 
     def _initialize_resources(self, resource_data: List[dict]):
         """Inicjalizuje źródła zasobów w lokacji."""
+        start = len(self._resource_store.quantity)
         for res_data in resource_data:
             self.resources.append(ResourceNode(
+                self._resource_store,
                 type=res_data['type'],
                 resource_id=res_data['id'],
                 quantity=res_data['quantity'],
@@ -68,79 +280,82 @@ class Location:
                 required_skill=res_data.get('required_skill'),
                 required_skill_level=res_data.get('required_skill_level', 0)
             ))
+        self.resource_range = (start, len(self._resource_store.quantity))
 
     def _initialize_weather(self):
         """Inicjalizuje system pogody dla lokacji."""
-        weather_types = {
-            'sunny': {
-                'description': 'Słoneczna pogoda',
-                'effects': {'visibility': 1.2, 'movement_speed': 1.1}
-            },
-            'rainy': {
-                'description': 'Pada deszcz',
-                'effects': {'visibility': 0.8, 'movement_speed': 0.9}
-            },
-            'stormy': {
-                'description': 'Szaleje burza',
-                'effects': {'visibility': 0.6, 'movement_speed': 0.7, 'combat_accuracy': 0.8}
-            }
-        }
-        
         # Losowy wybór pogody z uwzględnieniem typu lokacji
-        weather_type = random.choice(list(weather_types.keys()))
-        weather_data = weather_types[weather_type]
-        
-        self.weather = Weather(
-            type=weather_type,
-            intensity=random.uniform(0.5, 1.0),
-            effects=weather_data['effects'],
-            description=weather_data['description']
-            
-    
-        )
+        templates, cum_weights = _WEATHER_TABLES.get(self.type, _WEATHER_TABLES['neutral'])
+        index = bisect(cum_weights, _rand() * cum_weights[-1])
+        weather_type, effects, description = templates[index]
+        self.weather = Weather(weather_type, 0.5 + 0.5 * _rand(), effects, description)
 
     def add_item(self, item_id: str):
-        if item_id not in self.items:
-            self.items.append(item_id)
+        self.items[item_id] = self.items.get(item_id, 0) + 1
 
     def remove_item(self, item_id: str):
-        if item_id in self.items:
-            self.items.remove(item_id)
+        count = self.items.get(item_id, 0)
+        if count > 1:
+            self.items[item_id] = count - 1
+        elif count:
+            del self.items[item_id]
 
     def add_npc(self, npc_id: str):
-        if npc_id not in self.npcs:
-            self.npcs.append(npc_id)
+        npc_id = sys.intern(npc_id)
+        self.npcs.add(npc_id)
+        self._all_npcs.add(npc_id)
 
     def remove_npc(self, npc_id: str):
-        if npc_id in self.npcs:
-            self.npcs.remove(npc_id)
+        self.npcs.discard(npc_id)
+        if npc_id not in self.temporary_npcs:
+            self._all_npcs.discard(npc_id)
 
 
     def update(self, game_time: float):
-        """Aktualizuje stan lokacji."""
-        # Aktualizacja zasobów
-        for resource in self.resources:
-            if resource.quantity < 1 and (game_time - resource.last_harvested) >= resource.respawn_time:
-                resource.quantity = random.randint(1, 3)
-
+        """Aktualizuje stan lokacji (zasoby odnawia World.update dla całego świata)."""
         # Aktualizacja pogody
-        if random.random() < 0.1:  # 10% szansa na zmianę pogody
+        if _rand() < 0.1:  # 10% szansa na zmianę pogody
             self._initialize_weather()
 
-        # Sprawdzanie i aktywacja wydarzeń
-        self._check_events(game_time)
+        # Czas gry nie zaczyna się od zera - opóźnienia początkowe liczone są
+        # od pierwszej aktualizacji lokacji
+        if not self._events_scheduled:
+            self._event_heap = [(game_time + delay, index) for delay, index in self._event_heap]
+            self._events_scheduled = True
+
+        # Sprawdzanie i aktywacja wydarzeń (tylko gdy któreś czeka na sprawdzenie)
+        if self._event_heap and self._event_heap[0][0] <= game_time:
+            self._check_events(game_time)
 
     def _check_events(self, game_time: float):
         """Sprawdza i aktywuje wydarzenia w lokacji."""
-        for event_data in self.events:
+        heap = self._event_heap
+        retry = []
+        # Sprawdzane są tylko wydarzenia, których termin sprawdzenia już minął
+        while heap and heap[0][0] <= game_time:
+            _, index = heapq.heappop(heap)
+            event_data = self.events[index]
             event_id = event_data['id']
-            if event_id not in self.active_events:
-                if self._should_trigger_event(event_data, game_time):
-                    self.active_events.add(event_id)
-                    logger.info(f"Aktywowano wydarzenie {event_id} w lokacji {self.name}")
+            if event_id in self.active_events:
+                continue
+            if self._should_trigger_event(event_data, game_time):
+                self.active_events.add(event_id)
+                logger.info(f"Aktywowano wydarzenie {event_id} w lokacji {self.name}")
+            else:
+                interval = event_data.get('cooldown', _EVENT_CHECK_INTERVAL)
+                retry.append((game_time + interval, index))
+                
+        for entry in retry:
+            heapq.heappush(heap, entry)
 
     def _should_trigger_event(self, event_data: dict, game_time: float) -> bool:
         """Sprawdza czy wydarzenie powinno zostać aktywowane."""
+        # Najpierw losowanie - warunki sprawdzane są tylko dla wydarzeń, które
+        # przeszły losowanie (pewne wydarzenia nie zużywają losowania wcale)
+        probability = event_data.get('probability', 1.0)
+        if probability < 1.0 and _rand() >= probability:
+            return False
+            
         # Sprawdzenie warunków czasowych
         if 'time_condition' in event_data:
             time_condition = event_data['time_condition']
@@ -152,9 +367,7 @@ class Location:
             if event_data['weather_condition'] != self.weather.type:
                 return False
 
-        # Sprawdzenie innych warunków
-        probability = event_data.get('probability', 1.0)
-        return random.random() < probability
+        return True
 
     def _check_time_condition(self, condition: dict, game_time: float) -> bool:
         """Sprawdza warunki czasowe dla wydarzenia."""
@@ -163,16 +376,20 @@ class Location:
 
     def add_temporary_npc(self, npc_id: str, duration: float):
         """Dodaje tymczasowego NPC do lokacji."""
+        npc_id = sys.intern(npc_id)
         self.temporary_npcs.add(npc_id)
+        self._all_npcs.add(npc_id)
         # Tutaj można dodać logikę usuwania NPC po określonym czasie
 
     def remove_temporary_npc(self, npc_id: str):
         """Usuwa tymczasowego NPC z lokacji."""
         self.temporary_npcs.discard(npc_id)
+        if npc_id not in self.npcs:
+            self._all_npcs.discard(npc_id)
 
     def get_all_npcs(self) -> Set[str]:
-        """Zwraca wszystkich NPC w lokacji."""
-        return self.npcs.union(self.temporary_npcs)
+        """Zwraca wszystkich NPC w lokacji (zbiór tylko do odczytu)."""
+        return self._all_npcs
 
     def can_enter(self, player) -> tuple[bool, str]:
         """Sprawdza czy gracz może wejść do lokacji."""
@@ -185,44 +402,220 @@ class Location:
         return {
             'name': self.name,
             'description': self.description,
-            'weather': f"{self.weather.description} (intensywność: {self.weather.intensity:.1f})",
+            'weather': self.weather.format(),
             'danger_level': self.danger_level,
             'exits': self.exits,
-            'resources': [
-                f"{r.type} (ilość: {r.quantity})" for r in self.resources if r.quantity > 0
-            ],
+            'resources': [r.describe() for r in self.resources if r.quantity > 0],
             'active_events': list(self.active_events),
             'npcs': list(self.get_all_npcs())
         }
 
 class World:
     def __init__(self, data_file: str = 'data/world.json'):
+        self.data_file = Path(data_file)
+        # Gotowe obiekty lokacji zapisane obok pliku danych (picklem)
+        self.cache_file = self.data_file.with_suffix('.cache.pkl')
         self.locations: Dict[str, Location] = {}
+        # Źródła zasobów wszystkich lokacji w jednym ciągłym magazynie
+        self._resources = ResourceStore()
+        # Komórka siatki -> ID lokacji z pozycją na mapie w tej komórce
+        self._grid: Dict[Tuple[int, int], List[str]] = {}
+        # Typ lokacji (safe, dangerous, ...) -> ID lokacji tego typu
+        self._by_type: Dict[str, List[str]] = {}
+        # Lokacje wymagające aktualizacji w każdym cyklu (wydarzenia lub
+        # obecność gracza); pozostałe są pomijane w update()
+        self._active_locations: Set[str] = set()
+        self._player_location: Optional[str] = None
         self.npcs: Dict[str, NPC] = {}
         self.events: List[WorldEvent] = []
         self.time_manager = None  # Dodać zarządzanie czasem
         self.weather_system = None  # Dodać system pogody
+        self.load_world_data()
         
     def load_world_data(self):
         """Ładowanie danych świata."""
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            source_stat = os.stat(self.data_file)
+            header, cached = self._read_world_cache()
+            
+            # Niezmieniony plik danych: lokacje wczytywane są z pamięci podręcznej
+            if header and header.get('version') != _WORLD_CACHE_VERSION:
+                header, cached = None, None
+            if header and header['src_mtime'] == source_stat.st_mtime:
+                self._restore_cached_world(cached)
+                self._build_indexes()
+                return
+                
+            with open(self.data_file, 'rb') as f:
+                raw = f.read()
+            sha1 = hashlib.sha1(raw).hexdigest()
+            
+            if header and header['sha1'] == sha1:
+                self._restore_cached_world(cached)
+            else:
+                data = _json_loads(raw)
                 self.validate_world_data(data)
-                # Implementacja ładowania danych...
+                self._resources = ResourceStore()
+                self.locations = {
+                    sys.intern(loc_id): Location(loc_id, loc_data, self._resources)
+                    for loc_id, loc_data in data['world']['locations'].items()
+                }
+            self._build_indexes()
+            self._write_world_cache({
+                'version': _WORLD_CACHE_VERSION,
+                'src_mtime': source_stat.st_mtime,
+                'sha1': sha1
+            })
         except Exception as e:
             logger.error(f"Błąd ładowania świata: {e}")
             raise
 
+    def _restore_cached_world(self, cached: Tuple[Dict[str, Location], ResourceStore]):
+        """Przejmuje lokacje i magazyn zasobów z pamięci podręcznej świata."""
+        self.locations, self._resources = cached
+        self._intern_ids()
+        # Pogoda zapisana w pamięci podręcznej byłaby identyczna w każdej sesji
+        for location in self.locations.values():
+            location._initialize_weather()
+
+    def _intern_ids(self):
+        """Internuje ID lokacji i NPC wczytane z pamięci podręcznej (pickle ich nie internuje)."""
+        intern = sys.intern
+        locations = {}
+        for loc_id, location in self.locations.items():
+            location.id = loc_id = intern(loc_id)
+            location.exits = [intern(exit_id) for exit_id in location.exits]
+            location.npcs = {intern(npc_id) for npc_id in location.npcs}
+            location._all_npcs = {intern(npc_id) for npc_id in location._all_npcs}
+            locations[loc_id] = location
+        self.locations = locations
+
+    def _build_indexes(self):
+        """Buduje indeksy lokacji: według typu oraz siatkę przestrzenną."""
+        self._grid = {}
+        self._by_type = {}
+        self._active_locations = set()
+        for loc_id, location in self.locations.items():
+            if self._needs_update(loc_id, location):
+                self._active_locations.add(loc_id)
+            self._by_type.setdefault(location.type, []).append(loc_id)
+            if location.position:
+                self._grid.setdefault(_grid_cell(*location.position), []).append(loc_id)
+
+    def _needs_update(self, loc_id: str, location: Location) -> bool:
+        """Sprawdza czy lokacja musi być aktualizowana w każdym cyklu."""
+        return bool(
+            loc_id == self._player_location
+            or location._event_heap
+            or location.quest_triggers
+        )
+
+    def on_player_enter(self, loc_id: str):
+        """Aktywuje lokację, do której wszedł gracz."""
+        self._player_location = loc_id
+        location = self.locations.get(loc_id)
+        if location is None:
+            return
+        if loc_id not in self._active_locations:
+            # Pominięta w update() lokacja mogła przez ten czas zmienić pogodę
+            # (10% szansy w każdym cyklu), więc pogoda jest losowana na nowo
+            location._initialize_weather()
+            self._active_locations.add(loc_id)
+
+    def _set_location_type(self, loc_id: str, new_type: str):
+        """Zmienia typ lokacji, aktualizując indeks typów."""
+        location = self.locations[loc_id]
+        old_bucket = self._by_type.get(location.type)
+        if old_bucket and loc_id in old_bucket:
+            old_bucket.remove(loc_id)
+        location.type = new_type
+        self._by_type.setdefault(new_type, []).append(loc_id)
+
+    def get_locations_near(self, x: float, y: float, radius: float) -> List[str]:
+        """Zwraca ID lokacji w promieniu radius od punktu (x, y)."""
+        min_cx, min_cy = _grid_cell(x - radius, y - radius)
+        max_cx, max_cy = _grid_cell(x + radius, y + radius)
+        
+        # Sprawdzane są tylko komórki siatki pokrywające otoczenie punktu
+        nearby = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                for loc_id in self._grid.get((cx, cy), ()):
+                    loc_x, loc_y = self.locations[loc_id].position
+                    if math.hypot(loc_x - x, loc_y - y) <= radius:
+                        nearby.append(loc_id)
+        return nearby
+
+    def validate_world_data(self, data: dict):
+        """Sprawdza poprawność danych świata."""
+        locations = data.get('world', {}).get('locations')
+        if not isinstance(locations, dict):
+            raise LocationError("Brak listy lokacji w danych świata!")
+        for loc_id, loc_data in locations.items():
+            if 'name' not in loc_data or 'description' not in loc_data:
+                raise LocationError(f"Niekompletne dane lokacji {loc_id}!", loc_id)
+
+    def _read_world_cache(self) -> Tuple[Optional[dict], Optional[Tuple[Dict[str, Location], ResourceStore]]]:
+        """Wczytuje nagłówek oraz lokacje i magazyn zasobów z pamięci podręcznej świata."""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                header = pickle.load(f)
+                return header, pickle.load(f)
+        except Exception:
+            return None, None
+
+    def _write_world_cache(self, header: dict):
+        """Zapisuje lokacje i magazyn zasobów do pamięci podręcznej świata."""
+        tmp_path = self.cache_file.with_name(self.cache_file.name + '.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(
+                    (self.locations, self._resources), f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            tmp_path.unlink(missing_ok=True)
+            logger.warning(f"Nie udało się zapisać pamięci podręcznej świata: {e}")
+
     def get_location(self, loc_id: str) -> Optional[Location]:
         """Pobiera lokację po ID."""
         return self.locations.get(loc_id)
 
     def update(self, game_time: float):
         """Aktualizuje stan świata."""
+        for _ in self.update_iter(game_time):
+            pass
+
+    def update_iter(self, game_time: float,
+                    chunk: int = _UPDATE_CHUNK_SIZE) -> Generator[None, Optional[float], None]:
+        """Aktualizuje stan świata porcjami po chunk lokacji, oddając sterowanie między porcjami.
+
+        Kolejny czas gry można przekazać przez send(); bez niego porcja używa poprzedniego.
+        """
         self.current_time = game_time
-        for location in self.locations.values():
-            location.update(game_time)
+        # Odnawianie zasobów jednym przebiegiem po wspólnym magazynie
+        if self._resources.depleted:
+            self._resources.respawn(game_time)
+        locations = self.locations
+        needs_update = self._needs_update
+        # Kopia - między porcjami gracz może aktywować kolejne lokacje
+        active = list(self._active_locations)
+        idle = []
+        for start in range(0, len(active), chunk):
+            if start:
+                now = yield
+                if now is not None:
+                    game_time = self.current_time = now
+            for loc_id in active[start:start + chunk]:
+                location = locations[loc_id]
+                location.update(game_time)
+                if not needs_update(loc_id, location):
+                    idle.append(loc_id)
+        # Lokacje mogły zostać ponownie aktywowane w trakcie aktualizacji
+        self._active_locations.difference_update(
+            [loc_id for loc_id in idle if not needs_update(loc_id, locations[loc_id])]
+        )
         self._update_global_events(game_time)
 
     def _update_global_events(self, game_time: float):
@@ -243,10 +636,8 @@ class World:
 
     def get_safe_locations(self) -> List[str]:
         """Zwraca listę bezpiecznych lokacji."""
-        return [loc_id for loc_id, loc in self.locations.items() 
-                if loc.type == 'safe']
+        return self._by_type.get('safe', [])
 
     def get_dangerous_locations(self) -> List[str]:
         """Zwraca listę niebezpiecznych lokacji."""
-        return [loc_id for loc_id, loc in self.locations.items() 
-                if loc.type == 'dangerous']
\ No newline at end of file
+        return self._by_type.get('dangerous', [])
\ No newline at end of file